@@ -1,25 +1,40 @@
 """LangGraph agent graph for the HR Resume Agent.
 
 Uses ``create_react_agent`` from LangGraph prebuilt to build a ReAct agent
-with proper streaming support. The agent uses Claude as the LLM with
-three tools: search_resumes, get_candidate_resume, and list_candidates.
+with proper streaming support. The agent uses Claude as the LLM with the
+tools defined in ``app.agent.tools``.
 
 Public API
 ----------
-    get_graph()      -- Returns a compiled graph for the specified model.
-    run_agent()      -- Convenience async function to invoke the graph.
-    stream_agent()   -- Async generator yielding SSE-friendly token events.
+    get_graph()               -- Returns a compiled graph for the specified model.
+    run_agent()               -- Convenience async function to invoke the graph.
+    stream_agent()            -- Async generator yielding SSE-friendly token events.
+    submit_batch_analysis()   -- Submit an offline screening job to the Batch API.
+    get_batch_results()       -- Poll a submitted batch and collect its results.
 """
 
 import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from typing import AsyncGenerator, Optional
 
+from anthropic import AsyncAnthropic
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
 from langgraph.prebuilt import create_react_agent
 
 from app.agent.tools import agent_tools
 from app.config import settings
+from app.database import get_db
+from app.services.vector_store import get_all_chunks_for_resume
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +50,31 @@ SUPPORTED_MODELS = frozenset({
     "claude-opus-4-5-20250929",
 })
 
+# Model used for simple tool-dispatch turns routed away from Sonnet
+ROUTING_MODEL = "claude-3-5-haiku-20241022"
+
+# Beta features enabled on every Anthropic request. token-efficient-tools
+# trims output tokens on tool calls and is a no-op on models that don't
+# support it, so it is safe across the whole SUPPORTED_MODELS set.
+ANTHROPIC_BETA_FEATURES = "prompt-caching-2024-07-31,token-efficient-tools-2025-02-19"
+
+_SIMPLE_QUERY_RE = re.compile(r"(?i)\b(list|show|find|get|which|who)\b")
+_SIMPLE_QUERY_MAX_CHARS = 200
+
+
+def _classify_model(message: str, history: Optional[list] = None) -> str:
+    """Pick a model for a turn based on how demanding the message looks.
+
+    Short messages that read like a lookup or listing request ("list the
+    candidates", "who has Kubernetes experience?") are routed to Haiku,
+    which handles plain tool dispatch at a fraction of the cost. Anything
+    longer or more analytical stays on the default Sonnet model. Callers
+    that pass an explicit model bypass this heuristic entirely.
+    """
+    if len(message) < _SIMPLE_QUERY_MAX_CHARS and _SIMPLE_QUERY_RE.search(message):
+        return ROUTING_MODEL
+    return DEFAULT_MODEL
+
 # ---------------------------------------------------------------------------
 # System prompt
 # ---------------------------------------------------------------------------
@@ -44,7 +84,9 @@ You are an expert HR recruitment assistant. Your job is to analyze resumes \
 and find the best candidates for a given role.
 
 You have access to a database of candidate resumes. Use your tools to:
-1. Search for relevant candidates using search_resumes
+1. Search for relevant candidates using search_resumes; when you have \
+several related queries (e.g. multiple required skills), prefer a single \
+search_resumes_multi call over repeated search_resumes calls
 2. Retrieve full resumes using get_candidate_resume
 3. List available candidates using list_candidates
 
@@ -57,6 +99,20 @@ When analyzing candidates, provide:
 Be thorough and specific in your analysis. Reference specific experience, \
 skills, and qualifications from the resumes."""
 
+# The system prompt wrapped as a cache-controlled content block. Marking the
+# block with cache_control makes Anthropic cache the entire static prefix
+# (tool schemas + system prompt), so repeated turns and multi-step ReAct
+# iterations read the prefix from cache instead of re-processing it.
+_CACHED_SYSTEM_MESSAGE = SystemMessage(
+    content=[
+        {
+            "type": "text",
+            "text": SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+)
+
 # ---------------------------------------------------------------------------
 # Graph builder with model-aware caching
 # ---------------------------------------------------------------------------
@@ -90,6 +146,7 @@ def _get_llm(model: str | None = None) -> ChatAnthropic:
         anthropic_api_key=settings.anthropic_api_key,
         streaming=True,
         max_tokens=4096,
+        default_headers={"anthropic-beta": ANTHROPIC_BETA_FEATURES},
     )
 
 
@@ -114,7 +171,7 @@ def get_graph(model: str | None = None):
     compiled_graph = create_react_agent(
         model=llm,
         tools=agent_tools,
-        prompt=SYSTEM_PROMPT,
+        prompt=_CACHED_SYSTEM_MESSAGE,
     )
     _graph_cache[model_name] = compiled_graph
     logger.info("HR Resume Agent graph compiled for model: %s", model_name)
@@ -127,6 +184,67 @@ def get_graph(model: str | None = None):
 # ---------------------------------------------------------------------------
 
 
+# Sliding-window limits applied to conversation history before invocation
+_HISTORY_MAX_TURNS = 8
+_HISTORY_MAX_TOKENS = 6000
+
+
+def _estimate_tokens(msg) -> int:
+    """Rough token estimate for a history message (~4 chars per token)."""
+    if isinstance(msg, dict):
+        content = msg.get("content", "")
+    else:
+        content = getattr(msg, "content", "")
+    return len(str(content)) // 4
+
+
+def _is_user_message(msg) -> bool:
+    """True when a history message (dict or typed) is a user turn."""
+    if isinstance(msg, dict):
+        return msg.get("role", "user") == "user"
+    return isinstance(msg, HumanMessage)
+
+
+def _prune_history(
+    history: Optional[list],
+    max_turns: int = _HISTORY_MAX_TURNS,
+    max_tokens: int = _HISTORY_MAX_TOKENS,
+) -> Optional[list]:
+    """Trim conversation history to a sliding window before invocation.
+
+    Anthropic latency and cost scale with input tokens, and long
+    conversations accumulate large prior analyses and tool outputs. Keep
+    the most recent max_turns messages verbatim, then keep dropping the
+    oldest of those while the estimated token total exceeds max_tokens.
+    """
+    if not history:
+        return history
+
+    pruned = history[-max_turns:]
+    total = sum(_estimate_tokens(m) for m in pruned)
+    while len(pruned) > 1 and total > max_tokens:
+        total -= _estimate_tokens(pruned[0])
+        pruned = pruned[1:]
+
+    # History is stored as user/assistant pairs and the Messages API
+    # rejects conversations that open with an assistant turn, so drop
+    # any leading assistant messages the token trim left behind.
+    while pruned and not _is_user_message(pruned[0]):
+        pruned = pruned[1:]
+
+    if len(pruned) != len(history):
+        logger.debug(
+            "Pruned history from %d to %d message(s)", len(history), len(pruned)
+        )
+    return pruned
+
+
+# Role -> message constructor, so history rebuilding is a dict lookup
+# instead of per-message string comparisons. Unknown roles are skipped,
+# matching the previous branching behavior.
+_ROLE_CTOR = {"user": HumanMessage, "assistant": AIMessage}
+
+
 def _build_messages(
     message: str,
     history: Optional[list] = None,
@@ -136,12 +254,13 @@ def _build_messages(
 
     if history:
         for msg in history:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "user":
-                messages.append(HumanMessage(content=content))
-            elif role == "assistant":
-                messages.append(AIMessage(content=content))
+            if isinstance(msg, BaseMessage):
+                # Already-typed messages pass through without reconstruction
+                messages.append(msg)
+                continue
+            ctor = _ROLE_CTOR.get(msg.get("role", "user"))
+            if ctor is not None:
+                messages.append(ctor(content=msg.get("content", "")))
 
     messages.append(HumanMessage(content=message))
     return messages
@@ -168,13 +287,16 @@ async def run_agent(
     Returns:
         The final state dict from the graph invocation.
     """
+    if model is None:
+        model = _classify_model(message, history)
+
     graph = get_graph(model=model)
-    messages = _build_messages(message, history)
+    messages = _build_messages(message, _prune_history(history))
 
     logger.info(
         "run_agent: invoking graph with %d message(s) using model %s",
         len(messages),
-        model or DEFAULT_MODEL,
+        model,
     )
 
     final_state = await graph.ainvoke({"messages": messages})
@@ -187,14 +309,166 @@ async def run_agent(
     return final_state
 
 
+# ---------------------------------------------------------------------------
+# Batch API path for offline screening
+# ---------------------------------------------------------------------------
+
+_batch_client: Optional[AsyncAnthropic] = None
+
+
+def _get_batch_client() -> AsyncAnthropic:
+    """Return the shared AsyncAnthropic client, creating it on first call."""
+    global _batch_client
+    if _batch_client is None:
+        _batch_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+    return _batch_client
+
+
+async def submit_batch_analysis(
+    role_description: str,
+    candidate_ids: list[str],
+    model: str | None = None,
+) -> str:
+    """Submit an offline screening job via the Anthropic Batch API.
+
+    Bulk "screen all N candidates against this role" workloads are
+    latency-insensitive but token-heavy, so they go through the Batch API
+    (50% input+output discount) instead of the streaming path. One
+    single-turn request is built per candidate from the role description
+    and the reconstructed resume, with the candidate id as custom_id.
+
+    Args:
+        role_description: Free-text description of the role to screen for.
+        candidate_ids: Resume ids of the candidates to screen.
+        model: The Anthropic model to use. If None, uses DEFAULT_MODEL.
+
+    Returns:
+        The Anthropic batch id, also recorded in the batches collection.
+
+    Raises:
+        ValueError: On an unsupported model or if no candidate has any
+            stored resume content.
+    """
+    model_name = model or DEFAULT_MODEL
+    if model_name not in SUPPORTED_MODELS:
+        raise ValueError(
+            f"Unsupported model: {model_name}. "
+            f"Supported models: {', '.join(sorted(SUPPORTED_MODELS))}"
+        )
+
+    requests = []
+    for candidate_id in candidate_ids:
+        chunks = await get_all_chunks_for_resume(candidate_id)
+        if not chunks:
+            logger.warning(
+                "submit_batch_analysis: no chunks for candidate %s, skipping",
+                candidate_id,
+            )
+            continue
+
+        resume_text = "\n".join(chunk.get("text", "") for chunk in chunks)
+        candidate_name = chunks[0].get("candidate_name", "Unknown")
+        prompt = (
+            f"Role description:\n{role_description}\n\n"
+            f"Candidate: {candidate_name}\n"
+            f"Resume:\n{resume_text}\n\n"
+            "Analyze this candidate's fit for the role as instructed."
+        )
+
+        requests.append(
+            {
+                "custom_id": candidate_id,
+                "params": {
+                    "model": model_name,
+                    "max_tokens": 2048,
+                    "system": SYSTEM_PROMPT,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            }
+        )
+
+    if not requests:
+        raise ValueError("No stored resume content found for the given candidates")
+
+    client = _get_batch_client()
+    batch = await client.messages.batches.create(requests=requests)
+
+    await get_db()["batches"].insert_one(
+        {
+            "batch_id": batch.id,
+            "model": model_name,
+            "role_description": role_description,
+            "candidate_ids": [r["custom_id"] for r in requests],
+            "status": batch.processing_status,
+            "created_at": datetime.now(timezone.utc),
+        }
+    )
+
+    logger.info(
+        "Submitted batch %s (%d candidate(s), model %s)",
+        batch.id,
+        len(requests),
+        model_name,
+    )
+    return batch.id
+
+
+async def get_batch_results(batch_id: str) -> dict:
+    """Poll an Anthropic batch and collect per-candidate results.
+
+    Args:
+        batch_id: The batch id returned by submit_batch_analysis.
+
+    Returns:
+        Dict with the batch status and, once processing has ended, a
+        results list of {candidate_id, result, error} entries.
+    """
+    client = _get_batch_client()
+    batch = await client.messages.batches.retrieve(batch_id)
+
+    out: dict = {"batch_id": batch_id, "status": batch.processing_status, "results": []}
+
+    if batch.processing_status == "ended":
+        async for entry in await client.messages.batches.results(batch_id):
+            item = {"candidate_id": entry.custom_id, "result": None, "error": None}
+            if entry.result.type == "succeeded":
+                item["result"] = "".join(
+                    block.text
+                    for block in entry.result.message.content
+                    if getattr(block, "type", None) == "text"
+                )
+            else:
+                item["error"] = entry.result.type
+            out["results"].append(item)
+
+        await get_db()["batches"].update_one(
+            {"batch_id": batch_id},
+            {"$set": {"status": "ended"}},
+        )
+
+    return out
+
+
 def _extract_text(content) -> str:
     """Extract text from AIMessageChunk content.
 
     Handles both string content and Anthropic's list-of-blocks format.
+    Runs once per streamed chunk, so the two overwhelmingly common shapes
+    (plain string, single-block list) are fast-pathed with exact type
+    checks before falling back to the generic walk.
     """
-    if isinstance(content, str):
+    if type(content) is str:
         return content
 
+    if type(content) is list and len(content) == 1:
+        block = content[0]
+        if type(block) is dict:
+            return block.get("text") or ""
+        if type(block) is str:
+            return block
+
+    if isinstance(content, str):
+        return content
     if not isinstance(content, list):
         return ""
 
@@ -218,6 +492,17 @@ def _get_field(obj, key: str):
     return getattr(obj, key, None)
 
 
+# Token-coalescing thresholds for stream_agent: flush the pending buffer
+# once it holds this many characters or this much time has passed since the
+# last flush. Each yield becomes its own SSE frame downstream, so batching
+# tokens cuts per-frame overhead roughly tenfold without visible latency.
+_TOKEN_FLUSH_CHARS = 64
+_TOKEN_FLUSH_INTERVAL = 0.05  # seconds
+
+# Upper bound on remembered tool-call ids per stream (oldest evicted first)
+_EMITTED_TOOL_CALLS_MAX = 128
+
+
 async def stream_agent(
     message: str,
     role_description: str = "",
@@ -239,45 +524,93 @@ async def stream_agent(
         model: The Anthropic model to use. If None, uses DEFAULT_MODEL.
 
     Yields:
-        - ``{"type": "token", "content": "..."}`` for each LLM output token.
+        - ``{"type": "token", "content": "..."}`` for each small batch of
+          LLM output tokens (coalesced by size/time).
         - ``{"type": "tool_call", "name": "...", "args": {...}}`` when the
           LLM initiates a tool call.
         - ``{"type": "done"}`` when the graph finishes.
     """
+    if model is None:
+        model = _classify_model(message, history)
+
     graph = get_graph(model=model)
-    messages = _build_messages(message, history)
+    messages = _build_messages(message, _prune_history(history))
 
     logger.info(
         "stream_agent: starting streaming with %d message(s) using model %s",
         len(messages),
-        model or DEFAULT_MODEL,
+        model,
     )
 
-    emitted_tool_calls: set[str] = set()
+    # Ordered so the oldest ids can be evicted once the cap is reached
+    emitted_tool_calls: OrderedDict[str, None] = OrderedDict()
+    last_tc_id: Optional[str] = None
+
+    # Pending token batch -- flushed on size, elapsed time, before any
+    # non-token event, and at stream end so ordering is preserved.
+    buffer: list[str] = []
+    pending_chars = 0
+    last_flush = time.monotonic()
+
+    # Hoist hot-loop lookups to locals -- this loop runs once per token chunk
+    chunk_cls = AIMessageChunk
+    extract_text = _extract_text
+    monotonic = time.monotonic
 
     try:
         async for msg, metadata in graph.astream(
             {"messages": messages}, stream_mode="messages"
         ):
-            if not isinstance(msg, AIMessageChunk):
+            if not isinstance(msg, chunk_cls):
                 continue
 
-            # Extract text tokens
-            text = _extract_text(msg.content)
+            # Extract text tokens and coalesce them
+            text = extract_text(msg.content)
             if text:
-                yield {"type": "token", "content": text}
+                buffer.append(text)
+                pending_chars += len(text)
+                now = monotonic()
+                if (
+                    pending_chars >= _TOKEN_FLUSH_CHARS
+                    or now - last_flush >= _TOKEN_FLUSH_INTERVAL
+                ):
+                    yield {"type": "token", "content": "".join(buffer)}
+                    buffer.clear()
+                    pending_chars = 0
+                    last_flush = now
 
             # Extract tool calls (deduplicated)
             for tc in msg.tool_call_chunks or []:
                 tc_id = _get_field(tc, "id")
+                # Consecutive partial chunks repeat the same id; skip the
+                # membership check entirely for that common case.
+                if not tc_id or tc_id == last_tc_id:
+                    continue
                 tc_name = _get_field(tc, "name")
-                if tc_id and tc_name and tc_id not in emitted_tool_calls:
-                    emitted_tool_calls.add(tc_id)
-                    yield {"type": "tool_call", "name": tc_name, "args": {}}
+                if not tc_name:
+                    continue
+                last_tc_id = tc_id
+                if tc_id in emitted_tool_calls:
+                    continue
+                emitted_tool_calls[tc_id] = None
+                if len(emitted_tool_calls) > _EMITTED_TOOL_CALLS_MAX:
+                    emitted_tool_calls.popitem(last=False)
+                if buffer:
+                    yield {"type": "token", "content": "".join(buffer)}
+                    buffer.clear()
+                    pending_chars = 0
+                    last_flush = time.monotonic()
+                yield {"type": "tool_call", "name": tc_name, "args": {}}
 
     except Exception as exc:
         logger.error("stream_agent: error during streaming: %s", exc)
+        if buffer:
+            yield {"type": "token", "content": "".join(buffer)}
+            buffer.clear()
         yield {"type": "error", "content": str(exc)}
 
+    if buffer:
+        yield {"type": "token", "content": "".join(buffer)}
+
     yield {"type": "done"}
     logger.info("stream_agent: streaming completed.")
@@ -1,26 +1,88 @@
 """LangGraph agent tool definitions for the HR Resume Agent.
 
-Provides three async LangChain tools that the agent can invoke:
+Provides async LangChain tools that the agent can invoke:
     - search_resumes:       Vector-similarity search across resume chunks.
-    - get_candidate_resume: Reconstruct the full resume for a named candidate.
+    - search_resumes_multi: Batched vector search for several queries at once.
+    - get_candidate_resume: Reconstruct the resume for a named candidate.
+    - get_resume_section:   Fetch one full section of a stored resume.
     - list_candidates:      List all candidates in the system, optionally
                             filtered by position tag.
 
 All tools are async because they call the async MongoDB / VoyageAI services.
+
+Tool outputs are deliberately compact: every string returned here is carried
+back into each subsequent Anthropic request as a tool-result message, so
+verbose formatting makes context (and cost) grow quadratically over a
+multi-step ReAct loop. Raw data stays in MongoDB; the model gets a snippet
+and a way to ask for more.
 """
 
+import asyncio
+import hashlib
 import logging
-import re
+import time
+from collections import OrderedDict
 from typing import Optional
 
 from langchain_core.tools import tool
 
-from app.database import get_db
-from app.services.embeddings import embed_query
-from app.services.vector_store import get_all_chunks_for_resume, search_similar
+from app.database import NAME_COLLATION, get_db
+from app.services.embeddings import embed_query, embed_query_batch
+from app.services.vector_store import (
+    get_all_chunks_by_name,
+    get_all_chunks_for_resume,
+    search_similar,
+)
 
 logger = logging.getLogger(__name__)
 
+# TTL'd LRU cache of formatted search results. The ReAct loop frequently
+# re-issues the same or near-identical query across turns (e.g. a user
+# refining a role); a hit skips both the VoyageAI embed and the Atlas
+# vector search.
+_SEARCH_CACHE: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+_SEARCH_CACHE_MAX = 512
+_SEARCH_CACHE_TTL = 300.0  # seconds
+_SEARCH_CACHE_BYPASS_TOP_K = 50
+
+
+# Short-TTL cache for list_candidates -- the listing is deterministic for a
+# given filter, and the ReAct loop often re-issues the same call within a
+# single run.
+_LIST_CACHE: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+_LIST_CACHE_MAX = 64
+_LIST_CACHE_TTL = 60.0  # seconds
+
+
+def _search_cache_key(query: str, top_k: int, position_tag: Optional[str]) -> tuple:
+    return (hashlib.sha256(query.encode()).hexdigest(), top_k, position_tag)
+
+
+def _cache_get(
+    cache: OrderedDict[tuple, tuple[float, str]], key: tuple, ttl: float
+) -> Optional[str]:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.monotonic() - stored_at > ttl:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return value
+
+
+def _cache_put(
+    cache: OrderedDict[tuple, tuple[float, str]],
+    key: tuple,
+    value: str,
+    maxsize: int,
+) -> None:
+    cache[key] = (time.monotonic(), value)
+    cache.move_to_end(key)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
 
 @tool
 async def search_resumes(
@@ -43,9 +105,17 @@ async def search_resumes(
             uploaded under a specific job posting.
 
     Returns:
-        A formatted string listing each matching chunk with candidate
-        name, section type, relevance score, and a text snippet.
+        A compact listing, one line per matching chunk: candidate name,
+        section type, relevance score, and a text snippet.
     """
+    cache_key = None
+    if top_k <= _SEARCH_CACHE_BYPASS_TOP_K:
+        cache_key = _search_cache_key(query, top_k, position_tag)
+        cached = _cache_get(_SEARCH_CACHE, cache_key, _SEARCH_CACHE_TTL)
+        if cached is not None:
+            logger.debug("search_resumes cache hit for query '%s'", query[:80])
+            return cached
+
     try:
         query_embedding = await embed_query(query)
         results = await search_similar(
@@ -57,41 +127,106 @@ async def search_resumes(
         logger.error("search_resumes tool failed: %s", exc)
         return f"Error performing resume search: {exc}"
 
+    formatted = _format_search_results(results)
+    if cache_key is not None:
+        _cache_put(_SEARCH_CACHE, cache_key, formatted, _SEARCH_CACHE_MAX)
+    return formatted
+
+
+@tool
+async def search_resumes_multi(
+    queries: list[str],
+    top_k: int = 10,
+    position_tag: Optional[str] = None,
+) -> str:
+    """Search resume chunks for several related queries in a single call.
+
+    Embeds all queries in one VoyageAI request and runs the vector
+    searches concurrently, then merges and deduplicates the hits. Prefer
+    this tool over repeated search_resumes calls when exploring multiple
+    skills or requirements at once -- it pays one round-trip instead of
+    one per query.
+
+    Args:
+        queries: Natural-language search queries, one per skill or
+            requirement of interest.
+        top_k: Maximum number of matching chunks per query (default 10).
+        position_tag: Optional position tag to narrow results to resumes
+            uploaded under a specific job posting.
+
+    Returns:
+        A compact listing of the deduplicated matches across all queries,
+        sorted by relevance score.
+    """
+    if not queries:
+        return "No queries provided."
+
+    try:
+        embeddings = await embed_query_batch(queries)
+        result_lists = await asyncio.gather(
+            *[
+                search_similar(
+                    query_embedding=embedding,
+                    top_k=top_k,
+                    position_tag=position_tag,
+                )
+                for embedding in embeddings
+            ]
+        )
+    except Exception as exc:
+        logger.error("search_resumes_multi tool failed: %s", exc)
+        return f"Error performing resume search: {exc}"
+
+    # Merge across queries, keeping each chunk's best score.
+    merged: dict[tuple, dict] = {}
+    for results in result_lists:
+        for chunk in results:
+            key = (chunk.get("resume_id"), chunk.get("text"))
+            kept = merged.get(key)
+            if kept is None or chunk.get("score", 0.0) > kept.get("score", 0.0):
+                merged[key] = chunk
+
+    deduped = sorted(
+        merged.values(), key=lambda c: c.get("score", 0.0), reverse=True
+    )
+    return _format_search_results(deduped)
+
+
+def _format_search_results(results: list[dict]) -> str:
+    """Format vector-search hits as one compact line per chunk."""
     if not results:
         return "No matching resume chunks found for the given query."
 
-    lines = [f"Found {len(results)} matching resume chunk(s):\n"]
-    for i, chunk in enumerate(results, start=1):
-        score = chunk.get("score", 0.0)
-        candidate = chunk.get("candidate_name", "Unknown")
-        section = chunk.get("section_type", "unknown")
-        text = chunk.get("text", "")
-        # Truncate long text snippets for readability
-        snippet = text[:500] + "..." if len(text) > 500 else text
-
+    lines = [f"{len(results)} match(es) (candidate | section | score | snippet):"]
+    for chunk in results:
+        text = chunk.get("text", "").replace("\n", " ")
+        snippet = text[:200] + "..." if len(text) > 200 else text
         lines.append(
-            f"--- Result {i} ---\n"
-            f"Candidate: {candidate}\n"
-            f"Section:   {section}\n"
-            f"Score:     {score:.4f}\n"
-            f"Text:\n{snippet}\n"
+            f"{chunk.get('candidate_name', 'Unknown')} | "
+            f"{chunk.get('section_type', 'unknown')} | "
+            f"{chunk.get('score', 0.0):.2f} | "
+            f"{snippet}"
         )
 
     return "\n".join(lines)
 
 
 @tool
-async def get_candidate_resume(candidate_name: str) -> str:
-    """Retrieve and reconstruct the full resume for a specific candidate.
+async def get_candidate_resume(candidate_name: str, max_chars: int = 4000) -> str:
+    """Retrieve and reconstruct the resume for a specific candidate.
 
     Looks up the candidate in the resumes collection by name, then
     fetches all stored chunks for that resume and reassembles them
-    organised by section type. Use this tool when you need to review
-    a specific candidate's complete resume.
+    organised by section type. Long sections are truncated so the total
+    output stays within max_chars; use get_resume_section to read a
+    truncated section in full. Use this tool when you need to review
+    a specific candidate's resume.
 
     Args:
         candidate_name: The exact name of the candidate whose resume
             should be retrieved.
+        max_chars: Approximate cap on the total resume text returned
+            (default 4000).
 
     Returns:
         The reconstructed resume text organised by section, or an error
@@ -100,10 +235,18 @@ async def get_candidate_resume(candidate_name: str) -> str:
     db = get_db()
 
     try:
-        # Case-insensitive lookup to be forgiving of minor casing differences
-        escaped_name = re.escape(candidate_name)
-        resume_doc = await db.resumes.find_one(
-            {"candidate_name": {"$regex": f"^{escaped_name}$", "$options": "i"}},
+        # Fire the metadata lookup and the chunk fetch concurrently: the
+        # chunk query is keyed by candidate name, so it does not have to
+        # wait for the resume_id. The case-insensitive collation matches
+        # the index created in ensure_vector_index, so the lookup is an
+        # index seek while staying forgiving of casing differences.
+        resume_doc, chunks = await asyncio.gather(
+            db.resumes.find_one(
+                {"candidate_name": candidate_name},
+                {"_id": 1, "file_name": 1, "position_tag": 1, "upload_date": 1},
+                collation=NAME_COLLATION,
+            ),
+            get_all_chunks_by_name(candidate_name),
         )
     except Exception as exc:
         logger.error("get_candidate_resume DB lookup failed: %s", exc)
@@ -121,15 +264,18 @@ async def get_candidate_resume(candidate_name: str) -> str:
     position_tag = resume_doc.get("position_tag", "N/A")
     upload_date = resume_doc.get("upload_date", "N/A")
 
-    try:
-        chunks = await get_all_chunks_for_resume(resume_id)
-    except Exception as exc:
-        logger.error(
-            "get_candidate_resume chunk retrieval failed for %s: %s",
-            resume_id,
-            exc,
-        )
-        return f"Error retrieving resume chunks: {exc}"
+    if not chunks:
+        # The speculative name-keyed fetch misses when the stored name
+        # differs in casing; fall back to the id-keyed fetch.
+        try:
+            chunks = await get_all_chunks_for_resume(resume_id)
+        except Exception as exc:
+            logger.error(
+                "get_candidate_resume chunk retrieval failed for %s: %s",
+                resume_id,
+                exc,
+            )
+            return f"Error retrieving resume chunks: {exc}"
 
     if not chunks:
         return (
@@ -152,81 +298,156 @@ async def get_candidate_resume(candidate_name: str) -> str:
         f"{'=' * 60}\n"
     )
 
+    # Budget max_chars across sections; anything cut can be fetched in full
+    # via get_resume_section.
+    section_budget = max(max_chars // len(sections), 200)
+
     body_parts = []
     for section_type, texts in sections.items():
         section_title = section_type.replace("_", " ").title()
+        section_text = "\n".join(texts)
+        if len(section_text) > section_budget:
+            section_text = (
+                section_text[:section_budget]
+                + f"\n[truncated -- call get_resume_section('{resume_id}', "
+                f"'{section_type}') for the full text]"
+            )
         body_parts.append(f"\n## {section_title}\n")
-        body_parts.append("\n".join(texts))
+        body_parts.append(section_text)
 
     return header + "\n".join(body_parts)
 
 
 @tool
-async def list_candidates(position_tag: Optional[str] = None) -> str:
-    """List all candidates in the system with their resume metadata.
+async def get_resume_section(resume_id: str, section: str) -> str:
+    """Retrieve the full text of one section of a stored resume.
 
-    Queries the resumes collection and returns a formatted list of
-    every candidate. Optionally filters by position tag. Use this
-    tool to discover which candidates are available before performing
-    deeper searches or retrieving individual resumes.
+    Companion to get_candidate_resume, which truncates long sections to
+    keep its output compact. Use this tool when a truncated section needs
+    to be read in full.
+
+    Args:
+        resume_id: The resume identifier reported by get_candidate_resume.
+        section: The section type to fetch (e.g. "experience", "skills").
+
+    Returns:
+        The full text of the requested section, or an error message if the
+        resume or section is not found.
+    """
+    try:
+        chunks = await get_all_chunks_for_resume(resume_id)
+    except Exception as exc:
+        logger.error(
+            "get_resume_section chunk retrieval failed for %s: %s", resume_id, exc
+        )
+        return f"Error retrieving resume chunks: {exc}"
+
+    texts = [
+        chunk.get("text", "")
+        for chunk in chunks
+        if chunk.get("section_type") == section
+    ]
+
+    if not texts:
+        available = sorted({c.get("section_type", "other") for c in chunks})
+        if not available:
+            return f"No chunks stored for resume '{resume_id}'."
+        return (
+            f"No '{section}' section found for resume '{resume_id}'. "
+            f"Available sections: {', '.join(available)}."
+        )
+
+    return "\n".join(texts)
+
+
+@tool
+async def list_candidates(
+    position_tag: Optional[str] = None,
+    limit: int = 50,
+    skip: int = 0,
+) -> str:
+    """List candidates in the system with their resume metadata.
+
+    Queries the resumes collection and returns a formatted page of
+    candidates. Optionally filters by position tag. Use this tool to
+    discover which candidates are available before performing deeper
+    searches or retrieving individual resumes.
 
     Args:
         position_tag: Optional position tag to filter candidates by
             a specific job posting. If omitted, all candidates are
             returned.
+        limit: Maximum number of candidates per page (default 50).
+        skip: Number of candidates to skip; pass the value suggested at
+            the end of a full page to fetch the next one.
 
     Returns:
-        A formatted list of candidates with their file names, upload
-        dates, and position tags, or a message if none are found.
+        A compact list, one line per candidate, with file name, position
+        tag, section count, and embedding status, or a message if none
+        are found.
     """
+    cache_key = (position_tag, limit, skip)
+    cached = _cache_get(_LIST_CACHE, cache_key, _LIST_CACHE_TTL)
+    if cached is not None:
+        logger.debug("list_candidates cache hit for %s", cache_key)
+        return cached
+
     db = get_db()
 
     query: dict = {}
     if position_tag:
         query["position_tag"] = position_tag
 
+    lines: list[str] = []
+    count = 0
     try:
-        cursor = db.resumes.find(
-            query,
-            {
-                "_id": 1,
-                "candidate_name": 1,
-                "file_name": 1,
-                "upload_date": 1,
-                "position_tag": 1,
-                "sections_count": 1,
-                "embedding_status": 1,
-            },
+        cursor = (
+            db.resumes.find(
+                query,
+                {
+                    "_id": 1,
+                    "candidate_name": 1,
+                    "file_name": 1,
+                    "position_tag": 1,
+                    "sections_count": 1,
+                    "embedding_status": 1,
+                },
+            )
+            .skip(skip)
+            .limit(limit)
         )
-        docs = await cursor.to_list(length=None)
+        async for doc in cursor:
+            count += 1
+            lines.append(
+                f"- {doc.get('candidate_name', 'Unknown')} | "
+                f"{doc.get('file_name', 'N/A')} | "
+                f"{doc.get('position_tag') or 'N/A'} | "
+                f"{doc.get('sections_count', 0)} | "
+                f"{doc.get('embedding_status', 'unknown')}"
+            )
     except Exception as exc:
         logger.error("list_candidates DB query failed: %s", exc)
         return f"Error listing candidates: {exc}"
 
-    if not docs:
+    if not lines:
         filter_msg = f" for position '{position_tag}'" if position_tag else ""
         return f"No candidates found{filter_msg}."
 
-    lines = [f"Found {len(docs)} candidate(s):\n"]
-    for doc in docs:
-        name = doc.get("candidate_name", "Unknown")
-        file_name = doc.get("file_name", "N/A")
-        upload_date = doc.get("upload_date", "N/A")
-        pos_tag = doc.get("position_tag", "N/A")
-        sections = doc.get("sections_count", 0)
-        status = doc.get("embedding_status", "unknown")
+    header = f"{count} candidate(s) (name | file | position | sections | embeddings):"
+    if count == limit:
+        # A full page usually means there are more candidates to fetch
+        lines.append(f"... more may exist (call again with skip={skip + limit})")
 
-        lines.append(
-            f"- {name}\n"
-            f"    File:       {file_name}\n"
-            f"    Uploaded:   {upload_date}\n"
-            f"    Position:   {pos_tag}\n"
-            f"    Sections:   {sections}\n"
-            f"    Embeddings: {status}\n"
-        )
-
-    return "\n".join(lines)
+    formatted = "\n".join([header, *lines])
+    _cache_put(_LIST_CACHE, cache_key, formatted, _LIST_CACHE_MAX)
+    return formatted
 
 
 # Convenience list for registering all tools with the agent graph
-agent_tools = [search_resumes, get_candidate_resume, list_candidates]
+agent_tools = [
+    search_resumes,
+    search_resumes_multi,
+    get_candidate_resume,
+    get_resume_section,
+    list_candidates,
+]
@@ -14,5 +14,29 @@ class Settings(BaseSettings):
     anthropic_api_key: str
     atlas_connection_string: str
 
+    # Max VoyageAI embed requests in flight at once
+    voyage_concurrency: int = 4
+
+    # Output dtype for document embeddings: "float" or "int8". int8 comes
+    # back pre-quantized from the API at a quarter of the response size.
+    voyage_dtype: str = "float"
+
+    # VoyageAI client transport tuning
+    voyage_max_retries: int = 2
+    voyage_timeout: float = 30.0
+
+    # Drop vector-search results scoring below this; 0 disables the filter
+    rag_min_score: float = 0.0
+
+    # PDF text-extraction backend: "pdfium" (native, fast) or "plumber"
+    pdf_backend: str = "pdfium"
+
+    # Extract pdfplumber pages in parallel threads. Off by default:
+    # pdfplumber shares parser state across pages in some versions.
+    pdf_parallel_pages: bool = False
+
+    # Parse worker processes; 0 means one per CPU core
+    parse_workers: int = 0
+
 
 settings = Settings()
@@ -11,6 +11,10 @@ logger = logging.getLogger(__name__)
 
 VECTOR_INDEX_NAME = "resume_vector_index"
 
+# Case-insensitive collation (strength 2 ignores case and diacritics) used
+# for candidate-name lookups and the matching index on resumes.
+NAME_COLLATION = {"locale": "en", "strength": 2}
+
 client: AsyncIOMotorClient | None = None
 db: AsyncIOMotorDatabase | None = None
 
@@ -32,9 +36,30 @@ async def ensure_vector_index() -> None:
     """Create the Atlas Vector Search index on resume_chunks if it does not exist."""
     collection = get_db()["resume_chunks"]
 
+    # Regular B-tree index so name-keyed chunk fetches (and their
+    # chunk_index sort) are index-served instead of scanning the collection.
+    await collection.create_index([("candidate_name", 1), ("chunk_index", 1)])
+
+    # Case-insensitive index so candidate lookups by name are an index seek
+    # rather than a collection scan with a per-document regex.
+    await get_db()["resumes"].create_index(
+        [("candidate_name", 1)], collation=NAME_COLLATION
+    )
+
     index_def = SearchIndexModel(
         definition={
             "fields": [
+                # Embeddings are stored as int8 BSON vectors with a
+                # per-vector scale. Cosine similarity is scale-invariant,
+                # so the varying per-document scale cannot skew ranking
+                # (dotProduct would divide each true score by its
+                # document's scale), and scores stay in [0, 1] so the
+                # rag_min_score floor keeps its meaning.
+                #
+                # Note: create_search_index is a no-op when the index
+                # already exists, so deployments carrying the old
+                # float-array definition must drop and recreate it to
+                # pick up int8 storage.
                 {
                     "type": "vector",
                     "path": "embedding",
@@ -45,10 +70,6 @@ async def ensure_vector_index() -> None:
                     "type": "filter",
                     "path": "position_tag",
                 },
-                {
-                    "type": "filter",
-                    "path": "candidate_name",
-                },
             ]
         },
         name=VECTOR_INDEX_NAME,
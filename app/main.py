@@ -1,32 +1,61 @@
+import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from app.agent.graph import SUPPORTED_MODELS, get_graph
 from app.config import settings
 from app.database import close_db, connect_db, ensure_vector_index
-from app.routers.chat import router as chat_router
+from app.routers.batch import router as batch_router
+from app.routers.chat import (
+    router as chat_router,
+    start_persistence_flusher,
+    stop_persistence_flusher,
+)
 from app.routers.search import router as search_router
 from app.routers.upload import router as upload_router
+from app.services.parser import shutdown_parse_pool
 
 BASE_DIR = Path(__file__).resolve().parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
+async def _prewarm_graphs() -> None:
+    """Compile the agent graph for every supported model.
+
+    Front-loads create_react_agent compilation, ChatAnthropic construction,
+    and tool-schema serialization off the request path, so the first chat
+    request sees steady-state latency.
+    """
+    for model in SUPPORTED_MODELS:
+        await asyncio.to_thread(get_graph, model)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncGenerator[None]:
     await connect_db()
     await ensure_vector_index()
+    # Pre-warm in the background so startup itself stays fast
+    prewarm_task = asyncio.create_task(_prewarm_graphs())
+    start_persistence_flusher()
     yield
+    prewarm_task.cancel()
+    await stop_persistence_flusher()
+    shutdown_parse_pool()
     await close_db()
 
 
-app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app = FastAPI(
+    title=settings.app_name,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +70,7 @@ app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="stat
 app.include_router(upload_router)
 app.include_router(search_router)
 app.include_router(chat_router)
+app.include_router(batch_router)
 
 
 @app.get("/")
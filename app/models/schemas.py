@@ -23,11 +23,15 @@ class ResumeChunk(BaseModel):
 
 
 class ResumeDocument(BaseModel):
-    """Resume document stored in MongoDB resumes collection."""
+    """Resume document stored in MongoDB resumes collection.
+
+    The full extracted text is not part of this document; it lives in the
+    sibling resume_texts collection under the same _id so that list
+    queries never have to decode it.
+    """
 
     candidate_name: str
     file_name: str
-    raw_text: str
     upload_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     position_tag: str | None = None
     sections_count: int = 0
@@ -100,6 +104,35 @@ class ChatRequest(BaseModel):
         return v
 
 
+class BatchScreenRequest(BaseModel):
+    """Request body for the POST /api/batch/screen endpoint."""
+
+    role_description: str
+    candidate_ids: list[str]
+    model: str | None = None
+
+    @field_validator("role_description")
+    @classmethod
+    def role_description_must_not_be_empty(cls, v: str) -> str:
+        if not v.strip():
+            raise ValueError("role_description must not be empty")
+        return v
+
+    @field_validator("candidate_ids")
+    @classmethod
+    def candidate_ids_must_not_be_empty(cls, v: list[str]) -> list[str]:
+        if not v:
+            raise ValueError("candidate_ids must not be empty")
+        return v
+
+
+class BatchScreenResponse(BaseModel):
+    """Response returned after submitting a batch screening job."""
+
+    batch_id: str
+    submitted: int
+
+
 class ChatSessionItem(BaseModel):
     """Item schema for GET /api/chat/sessions list endpoint."""
 
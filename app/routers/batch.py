@@ -0,0 +1,48 @@
+"""Batch screening router - offline candidate screening via the Anthropic Batch API.
+
+Bulk screening is latency-insensitive but token-heavy, so it runs through
+the discounted asynchronous Batch API instead of the streaming chat path.
+"""
+
+import logging
+
+from fastapi import APIRouter, HTTPException
+
+from app.agent.graph import get_batch_results, submit_batch_analysis
+from app.models.schemas import BatchScreenRequest, BatchScreenResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+
+@router.post("/screen", response_model=BatchScreenResponse)
+async def screen_candidates(body: BatchScreenRequest) -> BatchScreenResponse:
+    """Submit a batch job screening the given candidates against a role.
+
+    Returns immediately with the batch id; results are collected later via
+    GET /api/batch/{batch_id}.
+    """
+    try:
+        batch_id = await submit_batch_analysis(
+            role_description=body.role_description,
+            candidate_ids=body.candidate_ids,
+            model=body.model,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception:
+        logger.exception("Batch submission failed")
+        raise HTTPException(status_code=502, detail="Batch submission failed")
+
+    return BatchScreenResponse(batch_id=batch_id, submitted=len(body.candidate_ids))
+
+
+@router.get("/{batch_id}")
+async def batch_results(batch_id: str) -> dict:
+    """Poll a submitted batch and return per-candidate results when ended."""
+    try:
+        return await get_batch_results(batch_id)
+    except Exception:
+        logger.exception("Failed to retrieve batch %s", batch_id)
+        raise HTTPException(status_code=502, detail="Failed to retrieve batch results")
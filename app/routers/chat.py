@@ -3,14 +3,24 @@
 Provides SSE streaming chat, session listing, and session deletion.
 """
 
-import json
+import asyncio
 import logging
 from datetime import datetime, timezone
 
+import orjson
+
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pymongo import UpdateOne
+
+try:  # FastAPI >= 0.135 frames SSE events natively and injects keep-alives
+    from fastapi.sse import EventSourceResponse, ServerSentEvent
+
+    _HAS_EVENT_SOURCE_RESPONSE = True
+except ImportError:  # older FastAPI: fall back to hand-rolled frames
+    _HAS_EVENT_SOURCE_RESPONSE = False
 
 from app.agent.graph import stream_agent
 from app.database import get_db
@@ -20,10 +30,127 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# Seconds to wait after the first queued update before flushing, so
+# concurrent turns coalesce into one bulk_write round-trip.
+_FLUSH_INTERVAL = 0.05
+
+_pending_updates: asyncio.Queue[UpdateOne] = asyncio.Queue()
+_flush_task: asyncio.Task | None = None
+
+
+async def _flush_pending_updates() -> None:
+    """Drain queued session updates into a single bulk_write per window.
+
+    Runs for the lifetime of the app. Waits for the first queued update,
+    sleeps one flush interval so concurrent turns can pile on, then writes
+    everything collected with one unordered bulk_write. Updates stay keyed
+    per session _id, so coalescing does not change per-session semantics.
+    """
+    db = get_db()
+    while True:
+        ops = [await _pending_updates.get()]
+        try:
+            await asyncio.sleep(_FLUSH_INTERVAL)
+            while not _pending_updates.empty():
+                ops.append(_pending_updates.get_nowait())
+        except asyncio.CancelledError:
+            # Shutdown landed during the coalescing window: hand the
+            # already-popped ops back so the shutdown drain writes them.
+            for op in ops:
+                _pending_updates.put_nowait(op)
+            raise
+
+        try:
+            await db["chat_sessions"].bulk_write(ops, ordered=False)
+            logger.info("Flushed %d session update(s) in one bulk_write", len(ops))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("Failed to flush %d session update(s): %s", len(ops), exc)
+
+
+def start_persistence_flusher() -> None:
+    """Start the background flush loop. Called from the app lifespan."""
+    global _flush_task
+    _flush_task = asyncio.create_task(_flush_pending_updates())
+
+
+async def stop_persistence_flusher() -> None:
+    """Cancel the flush loop and write out anything still queued."""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        # Await the cancellation so the loop can re-queue any ops it had
+        # popped mid-window before the drain below runs.
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+
+    ops: list[UpdateOne] = []
+    while not _pending_updates.empty():
+        ops.append(_pending_updates.get_nowait())
+
+    if ops:
+        try:
+            await get_db()["chat_sessions"].bulk_write(ops, ordered=False)
+        except Exception as exc:
+            logger.error(
+                "Failed to flush %d session update(s) on shutdown: %s",
+                len(ops),
+                exc,
+            )
+
+
+def _sse_event(payload: dict) -> bytes:
+    """Format a dict as a Server-Sent Event data frame.
+
+    Returns pre-encoded bytes: orjson already produces bytes, and
+    StreamingResponse passes byte chunks straight through, skipping both
+    the decode here and the UTF-8 encode Starlette performs on strings.
+    """
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+async def _as_sse_bytes(payloads, session_id_str: str):
+    """Frame payload dicts as hand-rolled SSE byte chunks.
+
+    The session and done frames are constant for the life of the stream,
+    so they are encoded once up front instead of serialized per emission.
+    """
+    session_frame = _sse_event({"type": "session", "session_id": session_id_str})
+    done_frame = _sse_event({"type": "done", "session_id": session_id_str})
+
+    async for payload in payloads:
+        payload_type = payload["type"]
+        if payload_type == "session":
+            yield session_frame
+        elif payload_type == "done":
+            yield done_frame
+        else:
+            yield _sse_event(payload)
+
+
+async def _as_sse_events(payloads, session_id_str: str):
+    """Frame payload dicts as ServerSentEvent objects for EventSourceResponse.
+
+    As in _as_sse_bytes, the constant session and done events are built
+    once per stream.
+    """
+    session_event = ServerSentEvent(
+        data={"type": "session", "session_id": session_id_str}
+    )
+    done_event = ServerSentEvent(data={"type": "done", "session_id": session_id_str})
 
-def _sse_event(payload: dict) -> str:
-    """Format a dict as a Server-Sent Event data line."""
-    return f"data: {json.dumps(payload)}\n\n"
+    async for payload in payloads:
+        payload_type = payload["type"]
+        if payload_type == "session":
+            yield session_event
+        elif payload_type == "done":
+            yield done_event
+        else:
+            yield ServerSentEvent(data=payload)
 
 
 def _parse_session_id(session_id: str) -> ObjectId:
@@ -35,21 +162,30 @@ def _parse_session_id(session_id: str) -> ObjectId:
 
 
 async def _get_or_create_session(
+    db,
     session_id: str | None,
     position_tag: str | None,
 ) -> tuple[ObjectId, list[dict], str | None]:
     """Load an existing session or create a new one.
 
+    Args:
+        db: Database handle, resolved once by the caller.
+
     Returns:
         Tuple of (session ObjectId, messages list, position_tag from session).
     """
-    db = get_db()
     collection = db["chat_sessions"]
 
     if session_id is not None:
         oid = _parse_session_id(session_id)
 
-        session = await collection.find_one({"_id": oid})
+        # Only the fields we use, and only the recent tail of the history
+        # (the agent prunes to fewer turns anyway) — keeps session load
+        # constant-time as conversations grow.
+        session = await collection.find_one(
+            {"_id": oid},
+            {"messages": {"$slice": -20}, "position_tag": 1},
+        )
         if session is None:
             raise HTTPException(status_code=404, detail="Session not found")
 
@@ -59,6 +195,7 @@ async def _get_or_create_session(
     result = await collection.insert_one(
         {
             "messages": [],
+            "message_count": 0,
             "position_tag": position_tag,
             "created_at": now,
             "updated_at": now,
@@ -74,14 +211,15 @@ async def _event_generator(
     position_tag: str | None,
     model: str | None,
 ):
-    """Async generator that yields SSE-formatted strings.
+    """Async generator that yields SSE payload dicts.
 
     Streams tokens from the agent graph, then persists the full
-    conversation turn to MongoDB once streaming completes.
+    conversation turn to MongoDB once streaming completes. Framing (bytes
+    or ServerSentEvent objects) is applied by the adapters below.
     """
     session_id_str = str(session_oid)
 
-    yield _sse_event({"type": "session", "session_id": session_id_str})
+    yield {"type": "session", "session_id": session_id_str}
 
     collected_tokens: list[str] = []
 
@@ -97,31 +235,31 @@ async def _event_generator(
             if event_type == "token":
                 content = event.get("content", "")
                 collected_tokens.append(content)
-                yield _sse_event({"type": "token", "content": content})
+                yield {"type": "token", "content": content}
 
             elif event_type == "tool_call":
-                yield _sse_event({
+                yield {
                     "type": "tool_call",
                     "name": event.get("name", ""),
                     "args": event.get("args", {}),
-                })
+                }
 
             elif event_type == "error":
-                yield _sse_event({"type": "error", "content": event.get("content", "")})
+                yield {"type": "error", "content": event.get("content", "")}
 
             elif event_type == "done":
-                yield _sse_event({"type": "done", "session_id": session_id_str})
+                yield {"type": "done", "session_id": session_id_str}
 
     except Exception as exc:
         logger.error("SSE stream error for session %s: %s", session_id_str, exc)
-        yield _sse_event({"type": "error", "content": str(exc)})
-        yield _sse_event({"type": "done", "session_id": session_id_str})
+        yield {"type": "error", "content": str(exc)}
+        yield {"type": "done", "session_id": session_id_str}
 
-    # Persist the conversation turn to MongoDB
+    # Queue the conversation turn for persistence; the background flusher
+    # coalesces concurrent turns into one bulk_write round-trip.
     full_response = "".join(collected_tokens)
-    try:
-        db = get_db()
-        await db["chat_sessions"].update_one(
+    await _pending_updates.put(
+        UpdateOne(
             {"_id": session_oid},
             {
                 "$push": {
@@ -132,20 +270,16 @@ async def _event_generator(
                         ]
                     }
                 },
+                "$inc": {"message_count": 2},
                 "$set": {"updated_at": datetime.now(timezone.utc)},
             },
         )
-        logger.info(
-            "Persisted conversation turn to session %s (%d token chunks)",
-            session_id_str,
-            len(collected_tokens),
-        )
-    except Exception as exc:
-        logger.error(
-            "Failed to persist conversation to session %s: %s",
-            session_id_str,
-            exc,
-        )
+    )
+    logger.info(
+        "Queued conversation turn for session %s (%d token chunks)",
+        session_id_str,
+        len(collected_tokens),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -161,6 +295,7 @@ async def chat(request: ChatRequest):
     and persists the full conversation turn to the session in MongoDB.
     """
     session_oid, history, position_tag = await _get_or_create_session(
+        get_db(),
         request.session_id,
         request.position_tag,
     )
@@ -172,8 +307,16 @@ async def chat(request: ChatRequest):
         model or "claude-sonnet-4-5-20250929 (default)",
     )
 
+    payloads = _event_generator(request, session_oid, history, position_tag, model)
+    session_id_str = str(session_oid)
+
+    if _HAS_EVENT_SOURCE_RESPONSE:
+        # EventSourceResponse frames events natively, sets the SSE headers
+        # itself, and injects keep-alive pings for proxies.
+        return EventSourceResponse(_as_sse_events(payloads, session_id_str))
+
     return StreamingResponse(
-        _event_generator(request, session_oid, history, position_tag, model),
+        _as_sse_bytes(payloads, session_id_str),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -183,25 +326,42 @@ async def chat(request: ChatRequest):
     )
 
 
-@router.get("/sessions", response_model=list[ChatSessionItem])
-async def list_sessions():
-    """List all chat sessions, sorted by most recently updated."""
+@router.get("/sessions", responses={200: {"model": list[ChatSessionItem]}})
+async def list_sessions() -> ORJSONResponse:
+    """List all chat sessions, sorted by most recently updated.
+
+    Returns raw dicts through ORJSONResponse, skipping both Pydantic model
+    construction and FastAPI's jsonable_encoder pass; ChatSessionItem is
+    kept for the OpenAPI schema only.
+    """
     db = get_db()
-    cursor = db["chat_sessions"].find().sort("updated_at", -1)
-
-    sessions: list[ChatSessionItem] = []
-    async for doc in cursor:
-        sessions.append(
-            ChatSessionItem(
-                id=str(doc["_id"]),
-                created_at=doc["created_at"],
-                updated_at=doc["updated_at"],
-                message_count=len(doc.get("messages", [])),
-                position_tag=doc.get("position_tag"),
-            )
-        )
+    # Project the exact response shape server-side: the messages array
+    # never leaves the server, _id is stringified in the pipeline, and
+    # sessions created before message_count existed fall back to counting
+    # their messages array.
+    pipeline = [
+        {"$sort": {"updated_at": -1}},
+        {
+            "$project": {
+                "_id": 0,
+                "id": {"$toString": "$_id"},
+                "created_at": 1,
+                "updated_at": 1,
+                "message_count": {
+                    "$ifNull": [
+                        "$message_count",
+                        {"$size": {"$ifNull": ["$messages", []]}},
+                    ]
+                },
+                "position_tag": {"$ifNull": ["$position_tag", None]},
+            }
+        },
+    ]
+    # length=None returns every session; the cursor still fetches in
+    # driver-sized batches under the hood.
+    sessions = await db["chat_sessions"].aggregate(pipeline).to_list(length=None)
 
-    return sessions
+    return ORJSONResponse(sessions)
 
 
 @router.delete("/sessions/{session_id}")
@@ -3,6 +3,7 @@
 import logging
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 
 from app.models.schemas import SearchRequest, SearchResult
 from app.services.embeddings import embed_query
@@ -13,13 +14,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["search"])
 
 
-@router.post("/search", response_model=list[SearchResult])
-async def search_resumes(body: SearchRequest) -> list[SearchResult]:
+@router.post("/search", responses={200: {"model": list[SearchResult]}})
+async def search_resumes(body: SearchRequest) -> ORJSONResponse:
     """Run a vector similarity search against stored resume chunks.
- 
+
     Embeds the incoming query text via VoyageAI, then performs a
     MongoDB Atlas vector search to find the closest matching chunks.
     Intended as a debug/testing endpoint for the embedding pipeline.
+
+    Results come back from Mongo already dict-shaped, so they are
+    serialized straight through ORJSONResponse; SearchResult is kept
+    for the OpenAPI schema only.
     """
     try:
         query_embedding = await embed_query(body.query)
@@ -39,24 +44,24 @@ async def search_resumes(body: SearchRequest) -> list[SearchResult]:
         logger.exception("Vector search failed")
         raise HTTPException(status_code=502, detail="Vector search service unavailable")
 
-    results = [
-        SearchResult(
-            text=doc.get("text", ""),
-            candidate_name=doc.get("candidate_name", ""),
-            section_type=doc.get("section_type", ""),
-            file_name=doc.get("file_name", ""),
-            position_tag=doc.get("position_tag"),
-            resume_id=doc.get("resume_id", ""),
-            score=doc.get("score", 0.0),
-        )
+    payload = [
+        {
+            "text": doc.get("text", ""),
+            "candidate_name": doc.get("candidate_name", ""),
+            "section_type": doc.get("section_type", ""),
+            "file_name": doc.get("file_name", ""),
+            "position_tag": doc.get("position_tag"),
+            "resume_id": doc.get("resume_id", ""),
+            "score": doc.get("score", 0.0),
+        }
         for doc in raw_results
     ]
 
     logger.info(
         "Search returned %d results for query='%s' (top_k=%d, position_tag=%s)",
-        len(results),
+        len(payload),
         body.query[:80],
         body.top_k,
         body.position_tag,
     )
-    return results
+    return ORJSONResponse(payload)
@@ -1,17 +1,19 @@
 """Resume upload router - handles file uploads, listing, deletion, and download."""
 
+import asyncio
 import logging
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import APIRouter, BackgroundTasks, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from app.config import settings
 from app.database import get_db
 from app.models.schemas import (
-    ResumeDocument,
     ResumeListItem,
     ResumeUploadResponse,
     UploadBatchResponse,
@@ -19,8 +21,8 @@ from app.models.schemas import (
 from app.services.chunker import chunk_resume
 from app.services.embeddings import embed_texts
 from app.services.extractor import extract_candidate_info
-from app.services.parser import parse_resume
-from app.services.vector_store import store_chunks
+from app.services.parser import parse_resume_path
+from app.services.vector_store import store_documents
 
 logger = logging.getLogger(__name__)
 
@@ -35,166 +37,269 @@ def _parse_object_id(resume_id: str) -> ObjectId:
         raise HTTPException(status_code=400, detail="Invalid resume ID format")
 
 
-async def _embed_and_store_chunks(chunks: list[dict], resume_id: str) -> None:
-    """Generate embeddings for resume chunks and store them in the vector store.
+# One pending embedding job per uploaded resume: the chunk texts, their
+# aligned metadata tuples, and the resume's string id.
+_EmbedJob = tuple[list[str], list[tuple[str, int, str, str, str | None]], str]
 
-    Runs as a background task after the upload response is returned.
-    Updates the resume document's embedding_status to 'completed' on success
-    or 'failed' on error.
+# Cap on files ingested concurrently within one upload request. Parsing
+# is already bounded by the process pool; this bound keeps open file
+# handles and buffered streams in check for very large batches.
+_MAX_CONCURRENT_INGESTS = 8
+
+
+async def _embed_and_store_batch(jobs: list[_EmbedJob]) -> None:
+    """Generate embeddings for a batch of resumes and store their chunks.
+
+    Runs as a single background task per upload request, embedding the
+    chunks of every resume in one embed_texts call so VoyageAI batches
+    fill across resume boundaries instead of one under-filled request
+    per file. Full chunk documents are assembled here, at insert time,
+    and every resume's embedding_status is updated to 'completed' on
+    success or 'failed' on error.
     """
     db = get_db()
+    resume_oids = [ObjectId(job[2]) for job in jobs]
     try:
-        texts = [chunk["text"] for chunk in chunks]
-        embeddings = await embed_texts(texts)
-
-        for chunk in chunks:
-            chunk["resume_id"] = resume_id
-
-        inserted = await store_chunks(chunks, embeddings)
-        await db.resumes.update_one(
-            {"_id": ObjectId(resume_id)},
+        all_texts = [text for texts, _, _ in jobs for text in texts]
+        embeddings = await embed_texts(all_texts)
+
+        documents = []
+        offset = 0
+        for texts, metas, resume_id in jobs:
+            job_embeddings = embeddings[offset : offset + len(texts)]
+            offset += len(texts)
+
+            # strict=True folds the alignment check into the single zip
+            # pass: a miscounted embeddings response raises here instead
+            # of silently truncating to the shortest list.
+            try:
+                documents.extend(
+                    {
+                        "text": text,
+                        "section_type": meta[0],
+                        "chunk_index": meta[1],
+                        "candidate_name": meta[2],
+                        "file_name": meta[3],
+                        "position_tag": meta[4],
+                        "resume_id": resume_id,
+                        "embedding": embedding,
+                    }
+                    for text, meta, embedding in zip(
+                        texts, metas, job_embeddings, strict=True
+                    )
+                )
+            except ValueError as exc:
+                raise ValueError(
+                    f"Chunk/embedding count mismatch for resume {resume_id}: "
+                    f"{len(texts)} texts, {len(metas)} metas, "
+                    f"{len(job_embeddings)} embeddings"
+                ) from exc
+
+        inserted = await store_documents(documents)
+        await db.resumes.update_many(
+            {"_id": {"$in": resume_oids}},
             {"$set": {"embedding_status": "completed"}},
         )
         logger.info(
-            "Background embedding completed for resume %s (%d chunks stored)",
-            resume_id,
+            "Background embedding completed for %d resume(s) (%d chunks stored)",
+            len(jobs),
             inserted,
         )
     except Exception as exc:
         logger.error(
-            "Background embedding failed for resume %s: %s", resume_id, exc
+            "Background embedding failed for resumes %s: %s",
+            [str(oid) for oid in resume_oids],
+            exc,
         )
         try:
-            await db.resumes.update_one(
-                {"_id": ObjectId(resume_id)},
+            await db.resumes.update_many(
+                {"_id": {"$in": resume_oids}},
                 {"$set": {"embedding_status": "failed"}},
             )
         except Exception as update_exc:
             logger.error(
-                "Failed to update embedding_status to 'failed' for resume %s: %s",
-                resume_id,
-                update_exc,
+                "Failed to update embedding_status to 'failed': %s", update_exc
             )
 
 
-@router.post("/upload", response_model=UploadBatchResponse)
-async def upload_resumes(
-    files: list[UploadFile],
-    background_tasks: BackgroundTasks,
-    position_tag: str = Form(None),
-) -> UploadBatchResponse:
-    """Upload one or more resume files (PDF or DOCX).
-
-    Parses each file, extracts candidate info, chunks the text into
-    sections, and stores both the document and its chunks in MongoDB.
+async def _ingest_one(
+    db,
+    uploads_path: Path,
+    file: UploadFile,
+    position_tag: str | None,
+    sem: asyncio.Semaphore,
+) -> tuple[ResumeUploadResponse | None, dict | None, _EmbedJob | None]:
+    """Ingest a single uploaded file: stream, parse, chunk, persist.
+
+    Returns (response, error, embed_job); exactly one of response/error
+    is set, and embed_job is present only for a successful ingest that
+    produced chunks. Runs concurrently across the files of one upload
+    request — parse work overlaps in the process pool while other files
+    are still streaming or waiting on MongoDB inserts.
     """
-    db = get_db()
-    uploaded: list[ResumeUploadResponse] = []
-    errors: list[dict] = []
-
-    uploads_path = Path(settings.uploads_dir)
-    uploads_path.mkdir(parents=True, exist_ok=True)
-
-    for file in files:
-        filename = file.filename or "unknown"
-        try:
-            content = await file.read()
-            if not content:
+    filename = file.filename or "unknown"
+    # Temp name while streaming; renamed to its id-prefixed final
+    # name once the client-side ObjectId is generated below.
+    tmp_path = uploads_path / f"tmp_{uuid.uuid4().hex}"
+    final_path: Path | None = None
+    try:
+        async with sem:
+            # Stream the upload to disk in 64KB chunks so large files
+            # never sit fully in memory.
+            size = 0
+            with tmp_path.open("wb") as dst:
+                while chunk := await file.read(1 << 16):
+                    dst.write(chunk)
+                    size += len(chunk)
+            if size == 0:
                 raise ValueError("Empty file")
 
-            raw_text = await parse_resume(content, filename)
+            raw_text = await parse_resume_path(tmp_path, filename)
             if not raw_text.strip():
                 raise ValueError("No text could be extracted from the file")
 
             candidate_info = extract_candidate_info(raw_text)
             candidate_name = candidate_info["name"]
 
-            chunks = chunk_resume(
+            texts, metas = chunk_resume(
                 text=raw_text,
                 candidate_name=candidate_name,
                 file_name=filename,
                 position_tag=position_tag,
             )
 
-            embedding_status = "processing" if chunks else "pending"
-
-            doc = ResumeDocument(
-                candidate_name=candidate_name,
-                file_name=filename,
-                raw_text=raw_text,
-                position_tag=position_tag,
-                sections_count=len(chunks),
-                embedding_status=embedding_status,
+            embedding_status = "processing" if texts else "pending"
+
+            # Generate the _id client-side so the file gets its final name
+            # and the document its file_path in a single insert, instead
+            # of insert + follow-up update.
+            resume_id = ObjectId()
+            final_path = uploads_path / f"{resume_id}_{filename}"
+            tmp_path.replace(final_path)
+
+            # Built from internally-generated values, so skip Pydantic
+            # validation and insert the dict directly (see ResumeDocument
+            # for the document schema). raw_text lives in the sibling
+            # resume_texts collection so list queries never decode it.
+            doc = {
+                "_id": resume_id,
+                "candidate_name": candidate_name,
+                "file_name": filename,
+                "upload_date": datetime.now(timezone.utc),
+                "position_tag": position_tag,
+                "sections_count": len(texts),
+                "file_path": str(final_path),
+                "embedding_status": embedding_status,
+            }
+
+            await db.resumes.insert_one(doc)
+
+            # Full text keyed by the same _id, fetched only on demand
+            await db.resume_texts.insert_one(
+                {"_id": resume_id, "raw_text": raw_text}
             )
 
-            result = await db.resumes.insert_one(doc.model_dump())
-            resume_id = result.inserted_id
+        response = ResumeUploadResponse.model_construct(
+            id=str(resume_id),
+            candidate_name=candidate_name,
+            file_name=filename,
+            sections_count=len(texts),
+            position_tag=position_tag,
+            embedding_status=embedding_status,
+        )
+        logger.info(
+            "Uploaded resume '%s' for '%s' (%d chunks)",
+            filename,
+            candidate_name,
+            len(texts),
+        )
+        embed_job = (texts, metas, str(resume_id)) if texts else None
+        return response, None, embed_job
+
+    except Exception as exc:
+        tmp_path.unlink(missing_ok=True)
+        if final_path is not None:
+            # Renamed before the insert failed; don't orphan the file
+            final_path.unlink(missing_ok=True)
+        logger.error("Failed to process file '%s': %s", filename, exc)
+        return None, {"file_name": filename, "error": str(exc)}, None
 
-            # Save original file to uploads directory
-            file_path = uploads_path / f"{resume_id}_{filename}"
-            file_path.write_bytes(content)
 
-            await db.resumes.update_one(
-                {"_id": resume_id},
-                {"$set": {"file_path": str(file_path)}},
-            )
+@router.post("/upload", response_model=UploadBatchResponse)
+async def upload_resumes(
+    files: list[UploadFile],
+    background_tasks: BackgroundTasks,
+    position_tag: str = Form(None),
+) -> UploadBatchResponse:
+    """Upload one or more resume files (PDF or DOCX).
 
-            if chunks:
-                background_tasks.add_task(
-                    _embed_and_store_chunks, chunks, str(resume_id)
-                )
+    Parses each file, extracts candidate info, chunks the text into
+    sections, and stores both the document and its chunks in MongoDB.
+    Files are ingested concurrently — parsing overlaps across the
+    process pool — and embedding runs afterwards as one background task
+    batching the chunks of all files together.
+    """
+    db = get_db()
 
-            uploaded.append(
-                ResumeUploadResponse(
-                    id=str(resume_id),
-                    candidate_name=candidate_name,
-                    file_name=filename,
-                    sections_count=len(chunks),
-                    position_tag=position_tag,
-                    embedding_status=embedding_status,
-                )
-            )
-            logger.info(
-                "Uploaded resume '%s' for '%s' (%d chunks)",
-                filename,
-                candidate_name,
-                len(chunks),
-            )
+    uploads_path = Path(settings.uploads_dir)
+    uploads_path.mkdir(parents=True, exist_ok=True)
+
+    sem = asyncio.Semaphore(_MAX_CONCURRENT_INGESTS)
+    results = await asyncio.gather(
+        *(_ingest_one(db, uploads_path, file, position_tag, sem) for file in files)
+    )
+
+    # gather preserves input order, so uploaded/errors keep the order
+    # the files were submitted in.
+    uploaded = [response for response, _, _ in results if response is not None]
+    errors = [error for _, error, _ in results if error is not None]
+    jobs = [job for _, _, job in results if job is not None]
 
-        except Exception as exc:
-            logger.error("Failed to process file '%s': %s", filename, exc)
-            errors.append({"file_name": filename, "error": str(exc)})
+    if jobs:
+        background_tasks.add_task(_embed_and_store_batch, jobs)
 
     return UploadBatchResponse(uploaded=uploaded, errors=errors)
 
 
-@router.get("", response_model=list[ResumeListItem])
+@router.get("", responses={200: {"model": list[ResumeListItem]}})
 async def list_resumes(
     position_tag: str | None = None,
-) -> list[ResumeListItem]:
-    """List all uploaded resumes, optionally filtered by position tag."""
+) -> ORJSONResponse:
+    """List all uploaded resumes, optionally filtered by position tag.
+
+    Returns raw dicts through ORJSONResponse, skipping both Pydantic model
+    construction and FastAPI's jsonable_encoder pass; ResumeListItem is
+    kept for the OpenAPI schema only.
+    """
     db = get_db()
 
     query: dict = {}
     if position_tag:
         query["position_tag"] = position_tag
 
-    cursor = db.resumes.find(query)
-    items: list[ResumeListItem] = []
-
-    async for doc in cursor:
-        items.append(
-            ResumeListItem(
-                id=str(doc["_id"]),
-                candidate_name=doc["candidate_name"],
-                file_name=doc["file_name"],
-                upload_date=doc["upload_date"],
-                position_tag=doc.get("position_tag"),
-                sections_count=doc.get("sections_count", 0),
-            )
-        )
-
-    return items
+    # Project the exact response shape server-side — including the
+    # stringified _id and defaults for missing fields — so the driver
+    # decodes only what is returned and no Python transform is needed.
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"upload_date": -1}},
+        {
+            "$project": {
+                "_id": 0,
+                "id": {"$toString": "$_id"},
+                "candidate_name": 1,
+                "file_name": 1,
+                "upload_date": 1,
+                "position_tag": {"$ifNull": ["$position_tag", None]},
+                "sections_count": {"$ifNull": ["$sections_count", 0]},
+            }
+        },
+    ]
+    # length=None returns every resume; the cursor still fetches in
+    # driver-sized batches under the hood.
+    items = await db.resumes.aggregate(pipeline).to_list(length=None)
+
+    return ORJSONResponse(items)
 
 
 @router.delete("/{resume_id}")
@@ -203,11 +308,12 @@ async def delete_resume(resume_id: str) -> dict:
     db = get_db()
     obj_id = _parse_object_id(resume_id)
 
-    doc = await db.resumes.find_one({"_id": obj_id})
+    doc = await db.resumes.find_one({"_id": obj_id}, {"raw_text": 0})
     if doc is None:
         raise HTTPException(status_code=404, detail="Resume not found")
 
     await db.resumes.delete_one({"_id": obj_id})
+    await db.resume_texts.delete_one({"_id": obj_id})
     await db.resume_chunks.delete_many({"resume_id": resume_id})
 
     file_path = doc.get("file_path")
@@ -231,7 +337,7 @@ async def download_resume(resume_id: str) -> FileResponse:
     db = get_db()
     obj_id = _parse_object_id(resume_id)
 
-    doc = await db.resumes.find_one({"_id": obj_id})
+    doc = await db.resumes.find_one({"_id": obj_id}, {"raw_text": 0})
     if doc is None:
         raise HTTPException(status_code=404, detail="Resume not found")
 
@@ -1,5 +1,6 @@
 import logging
 import re
+from bisect import bisect_left, bisect_right
 
 logger = logging.getLogger(__name__)
 
@@ -57,24 +58,86 @@ _all_keywords = sorted(
 
 _keyword_pattern = "|".join(re.escape(kw) for kw, _ in _all_keywords)
 
-SECTION_HEADER_RE = re.compile(
-    rf"^\s*({_keyword_pattern})\s*[:—\-]*\s*$",
+_SECTION_HEADER_PATTERN = rf"^\s*({_keyword_pattern})\s*[:—\-]*\s*$"
+
+# Prefer google-re2 when available: its DFA executes the ~60-way alternation
+# in time linear in the input, independent of alternation count, and cannot
+# backtrack catastrophically on adversarial resumes. re2 is flag-compatible
+# with re, so the fallback is a drop-in swap.
+try:
+    import re2 as _header_re_engine
+except ImportError:
+    _header_re_engine = re
+
+SECTION_HEADER_RE = _header_re_engine.compile(
+    _SECTION_HEADER_PATTERN,
     re.IGNORECASE | re.MULTILINE,
 )
 
-_KEYWORD_TO_TYPE: dict[str, str] = {
-    kw.lower(): stype for kw, stype in _all_keywords
-}
+# Exact-lookup table over every keyword plus cheap variants (trailing-s
+# singular/plural, spaces removed), so normalizing a header is a single
+# dict hit in the common case. Built longest-keyword-first; setdefault
+# lets the more specific keyword win variant collisions.
+_HEADER_INDEX: dict[str, str] = {}
+for _kw, _stype in _all_keywords:
+    _kw_lower = _kw.lower()
+    _variants = (
+        _kw_lower,
+        _kw_lower.rstrip("s"),
+        _kw_lower + "s",
+        _kw_lower.replace(" ", ""),
+    )
+    for _variant in _variants:
+        _HEADER_INDEX.setdefault(_variant, _stype)
+
+# Aho-Corasick automaton over all keywords so the partial-match fallback
+# in _normalize_section_type runs in O(len(header)) instead of scanning
+# every keyword. Optional: the linear scan remains as the fallback.
+try:
+    import ahocorasick
+
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _kw, _stype in _all_keywords:
+        _KEYWORD_AUTOMATON.add_word(_kw.lower(), (_kw.lower(), _stype))
+    _KEYWORD_AUTOMATON.make_automaton()
+except ImportError:
+    _KEYWORD_AUTOMATON = None
 
-_SENTENCE_BREAK_RE = re.compile(r"[.!?]\s", re.DOTALL)
+# All candidate break points in one alternation, best-first so "\n\n"
+# wins over "\n" at the same position. Priorities: 0 paragraph break,
+# 1 sentence end, 2 newline, 3 word boundary.
+_ALL_BREAKS_RE = re.compile(r"\n\n|[.!?]\s|\n| ")
+
+_BREAK_PRIORITY: dict[str, int] = {"\n\n": 0, "\n": 2, " ": 3}
 
 
 def _normalize_section_type(header_text: str) -> str:
     """Map a detected header string to a normalized section type."""
-    cleaned = header_text.strip().rstrip(":").rstrip("-").rstrip("\u2014").strip().lower()
-    if cleaned in _KEYWORD_TO_TYPE:
-        return _KEYWORD_TO_TYPE[cleaned]
-    # Fallback: partial match against keywords
+    # One strip pass over all trim characters; the old chained rstrips
+    # allocated an intermediate string each and missed mixed trailers
+    # like ":\u2014" (each call strips only its own char class, in order).
+    cleaned = header_text.strip(" \t\r\n:-\u2014").lower()
+    section_type = _HEADER_INDEX.get(cleaned)
+    if section_type is not None:
+        return section_type
+
+    # Fallback 1: keyword contained in the header. The automaton streams
+    # all keyword occurrences in one pass; keep the longest hit to mirror
+    # the longest-first ordering of the linear scan.
+    if _KEYWORD_AUTOMATON is not None:
+        best: tuple[str, str] | None = None
+        for _end, (kw, stype) in _KEYWORD_AUTOMATON.iter(cleaned):
+            if best is None or len(kw) > len(best[0]):
+                best = (kw, stype)
+        if best is not None:
+            return best[1]
+        # Fallback 2: header contained in a keyword
+        for kw, stype in _all_keywords:
+            if cleaned in kw:
+                return stype
+        return "other"
+
+    # Linear fallback when pyahocorasick is not installed
     for kw, stype in _all_keywords:
         if kw in cleaned or cleaned in kw:
             return stype
@@ -126,6 +189,20 @@ def sub_chunk(text: str, max_size: int = MAX_CHUNK_SIZE, overlap: int = OVERLAP_
     if len(text) <= max_size:
         return [text]
 
+    # Precompute every candidate break once: the position *after* each
+    # break and its priority (lower is better), kept as two parallel
+    # lists so the hot window loop below does plain index reads instead
+    # of tuple unpacking. A single finditer pass replaces the repeated
+    # rfind scans over overlapping windows, making the whole split O(n)
+    # in the section length.
+    positions: list[int] = []
+    priorities: list[int] = []
+    for m in _ALL_BREAKS_RE.finditer(text):
+        positions.append(m.end())
+        priorities.append(_BREAK_PRIORITY.get(m.group(), 1))
+
+    search_offset = max_size * 6 // 10
+
     chunks: list[str] = []
     start = 0
 
@@ -138,69 +215,40 @@ def sub_chunk(text: str, max_size: int = MAX_CHUNK_SIZE, overlap: int = OVERLAP_
                 chunks.append(chunk)
             break
 
-        segment = text[start:end]
-        break_pos = _find_break_point(segment)
+        # Latest break of each priority within [start + 0.6*max, end]
+        lo = bisect_left(positions, start + search_offset)
+        hi = bisect_right(positions, end)
+
+        latest = [-1, -1, -1, -1]
+        for i in range(lo, hi):
+            latest[priorities[i]] = positions[i]  # positions are ascending
+
+        break_end = next((pos for pos in latest if pos != -1), end)
 
-        chunk = text[start : start + break_pos].strip()
+        chunk = text[start:break_end].strip()
         if chunk:
             chunks.append(chunk)
 
-        next_start = start + break_pos - overlap
+        next_start = break_end - overlap
         if next_start <= start:
-            next_start = start + break_pos
+            next_start = break_end
         start = next_start
 
     return chunks
 
 
-def _find_break_point(segment: str) -> int:
-    """Find the best position to break a text segment.
-
-    Preference order:
-    1. Last paragraph break (double newline)
-    2. Last sentence-ending punctuation followed by space or newline
-    3. Last single newline
-    4. Last space (word boundary)
-    5. End of segment (hard cut)
-    """
-    search_start = len(segment) * 6 // 10
-
-    # 1. Paragraph break
-    pos = segment.rfind("\n\n", search_start)
-    if pos != -1:
-        return pos + 2
-
-    # 2. Sentence boundary
-    last_sentence = None
-    for m in _SENTENCE_BREAK_RE.finditer(segment, search_start):
-        last_sentence = m
-    if last_sentence:
-        return last_sentence.end()
-
-    # 3. Single newline
-    pos = segment.rfind("\n", search_start)
-    if pos != -1:
-        return pos + 1
-
-    # 4. Word boundary
-    pos = segment.rfind(" ", search_start)
-    if pos != -1:
-        return pos + 1
-
-    # 5. Hard cut
-    return len(segment)
-
-
 def chunk_resume(
     text: str,
     candidate_name: str,
     file_name: str,
     position_tag: str | None = None,
-) -> list[dict]:
+) -> tuple[list[str], list[tuple[str, int, str, str, str | None]]]:
     """Chunk a resume text into sections suitable for vector embedding.
 
-    Each returned dict matches the ResumeChunk schema:
-        text, section_type, chunk_index, candidate_name, file_name, position_tag
+    Returns the chunk texts and their metadata as two aligned lists
+    rather than one dict per chunk: embed_texts wants the bare texts, and
+    the storage layer assembles full documents only at insert time, so
+    the intermediate dicts were pure allocator overhead.
 
     Args:
         text: Full plaintext of the resume.
@@ -209,28 +257,25 @@ def chunk_resume(
         position_tag: Optional position/role tag for filtering.
 
     Returns:
-        List of chunk dictionaries ready for embedding and storage.
+        Tuple of (texts, metas), aligned by index. Each meta is a
+        (section_type, chunk_index, candidate_name, file_name,
+        position_tag) tuple, matching the ResumeChunk schema fields.
     """
     if not text or not text.strip():
         logger.warning("Empty resume text for candidate '%s'", candidate_name)
-        return []
+        return [], []
 
     sections = detect_sections(text)
-    chunks: list[dict] = []
+    texts: list[str] = []
+    metas: list[tuple[str, int, str, str, str | None]] = []
     chunk_index = 0
 
     for section_type, section_text in sections:
-        sub_chunks = sub_chunk(section_text, MAX_CHUNK_SIZE, OVERLAP_SIZE)
-
-        for sc_text in sub_chunks:
-            chunks.append({
-                "text": sc_text,
-                "section_type": section_type,
-                "chunk_index": chunk_index,
-                "candidate_name": candidate_name,
-                "file_name": file_name,
-                "position_tag": position_tag,
-            })
+        for sc_text in sub_chunk(section_text, MAX_CHUNK_SIZE, OVERLAP_SIZE):
+            texts.append(sc_text)
+            metas.append(
+                (section_type, chunk_index, candidate_name, file_name, position_tag)
+            )
             chunk_index += 1
 
     logger.info(
@@ -238,7 +283,7 @@ def chunk_resume(
         candidate_name,
         file_name,
         len(sections),
-        len(chunks),
+        len(texts),
     )
 
-    return chunks
+    return texts, metas
@@ -5,7 +5,10 @@ support: documents are embedded with input_type="document" and queries
 with input_type="query".
 """
 
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
 
 import voyageai
 
@@ -18,27 +21,100 @@ BATCH_SIZE = 128  # VoyageAI max texts per request
 
 _client: voyageai.AsyncClient | None = None
 
+# Bounds concurrent embed requests so large jobs overlap round-trips
+# without flooding the API. Created lazily to bind to the running loop.
+_embed_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _embed_semaphore
+    if _embed_semaphore is None:
+        _embed_semaphore = asyncio.Semaphore(settings.voyage_concurrency)
+    return _embed_semaphore
+
+
+# LRU over query embeddings, keyed by a digest of (model, query text).
+# Repeat queries -- common in retrieval UIs -- skip the API round-trip.
+_QUERY_CACHE_MAX = 1024
+
+_query_cache: OrderedDict[bytes, list[float]] = OrderedDict()
+_query_cache_lock = asyncio.Lock()
+
+
+def _query_cache_key(text: str) -> bytes:
+    return hashlib.blake2b(f"{MODEL}:{text}".encode(), digest_size=16).digest()
+
 
 def _get_client() -> voyageai.AsyncClient:
-    """Return the shared AsyncClient, creating it on first call."""
+    """Return the shared AsyncClient, creating it on first call.
+
+    One client for the whole process: the SDK holds a persistent aiohttp
+    session underneath, so concurrent embed batches reuse warm keep-alive
+    connections instead of paying a TLS handshake per call. Retries and
+    the request timeout are folded into the client itself.
+    """
     global _client
     if _client is None:
-        _client = voyageai.AsyncClient(api_key=settings.voyage_api_key)
+        _client = voyageai.AsyncClient(
+            api_key=settings.voyage_api_key,
+            max_retries=settings.voyage_max_retries,
+            timeout=settings.voyage_timeout,
+        )
         logger.info("VoyageAI AsyncClient initialized (model=%s)", MODEL)
     return _client
 
 
+async def _embed_batch(
+    batch_num: int,
+    total_batches: int,
+    batch: list[str],
+) -> list[list[float]]:
+    """Embed one batch under the shared concurrency semaphore."""
+    async with _get_semaphore():
+        try:
+            result = await _get_client().embed(
+                batch,
+                model=MODEL,
+                input_type="document",
+                output_dtype=settings.voyage_dtype,
+            )
+        except Exception:
+            logger.exception(
+                "VoyageAI embed failed on batch %d/%d (%d texts)",
+                batch_num,
+                total_batches,
+                len(batch),
+            )
+            raise
+
+    logger.debug(
+        "Embedded batch %d/%d (%d texts, %d tokens)",
+        batch_num,
+        total_batches,
+        len(batch),
+        result.total_tokens,
+    )
+    return result.embeddings
+
+
 async def embed_texts(texts: list[str]) -> list[list[float]]:
     """Embed a list of document texts into float vectors.
 
     Handles batching automatically -- VoyageAI accepts at most 128 texts
-    per request, so larger lists are split into sequential batches.
+    per request. Batches are dispatched concurrently (bounded by
+    settings.voyage_concurrency) so a large job pays roughly one
+    round-trip latency instead of one per batch; results are reassembled
+    in input order.
+
+    Vectors come back in settings.voyage_dtype: float lists by default,
+    or provider-quantized int8 lists that the storage layer wraps into
+    BSON binary vectors without re-quantizing.
 
     Args:
         texts: Plain-text strings to embed (resume chunks, etc.).
 
     Returns:
-        List of 1024-dimension float vectors, one per input text.
+        List of 1024-dimension vectors, one per input text.
 
     Raises:
         voyageai.error.VoyageError: On API-level failures after retries.
@@ -47,46 +123,74 @@ async def embed_texts(texts: list[str]) -> list[list[float]]:
     if not texts:
         raise ValueError("embed_texts requires at least one text")
 
-    client = _get_client()
-    all_embeddings: list[list[float]] = []
-    total_batches = (len(texts) + BATCH_SIZE - 1) // BATCH_SIZE
-
-    for batch_start in range(0, len(texts), BATCH_SIZE):
-        batch = texts[batch_start : batch_start + BATCH_SIZE]
-        batch_num = batch_start // BATCH_SIZE + 1
+    batches = [
+        texts[batch_start : batch_start + BATCH_SIZE]
+        for batch_start in range(0, len(texts), BATCH_SIZE)
+    ]
+    total_batches = len(batches)
+
+    # gather preserves input order; a failing batch propagates and
+    # cancels its siblings.
+    batch_results = await asyncio.gather(
+        *(
+            _embed_batch(batch_num, total_batches, batch)
+            for batch_num, batch in enumerate(batches, start=1)
+        )
+    )
 
-        try:
-            result = await client.embed(
-                batch,
-                model=MODEL,
-                input_type="document",
-            )
-            all_embeddings.extend(result.embeddings)
-            logger.debug(
-                "Embedded batch %d/%d (%d texts, %d tokens)",
-                batch_num,
-                total_batches,
-                len(batch),
-                result.total_tokens,
-            )
-        except Exception:
-            logger.exception(
-                "VoyageAI embed failed on batch %d/%d (%d texts)",
-                batch_num,
-                total_batches,
-                len(batch),
-            )
-            raise
+    all_embeddings: list[list[float]] = []
+    for embeddings in batch_results:
+        all_embeddings.extend(embeddings)
 
     logger.info("Embedded %d texts in %d batch(es)", len(texts), total_batches)
     return all_embeddings
 
 
+async def embed_query_batch(texts: list[str]) -> list[list[float]]:
+    """Embed multiple search queries in a single VoyageAI request.
+
+    Batched companion to ``embed_query`` -- amortizes one network round-trip
+    across all queries instead of paying it once per query.
+
+    Args:
+        texts: The search query strings (at most BATCH_SIZE).
+
+    Returns:
+        One 1024-dimension float vector per input query, in input order.
+
+    Raises:
+        voyageai.error.VoyageError: On API-level failures.
+        ValueError: If *texts* is empty or contains a blank query.
+    """
+    if not texts:
+        raise ValueError("embed_query_batch requires at least one query string")
+    if any(not t or not t.strip() for t in texts):
+        raise ValueError("embed_query_batch requires non-empty query strings")
+
+    client = _get_client()
+
+    try:
+        result = await client.embed(
+            texts,
+            model=MODEL,
+            input_type="query",
+        )
+        logger.debug(
+            "Embedded %d queries (%d tokens)", len(texts), result.total_tokens
+        )
+        return result.embeddings
+    except Exception:
+        logger.exception("VoyageAI embed_query_batch failed")
+        raise
+
+
 async def embed_query(text: str) -> list[float]:
     """Embed a single search query into a float vector.
 
     Uses ``input_type="query"`` so the resulting vector is optimised for
-    asymmetric retrieval against document embeddings.
+    asymmetric retrieval against document embeddings. Results are cached
+    in a small in-process LRU, so repeated queries return without an API
+    round-trip.
 
     Args:
         text: The search query string.
@@ -101,6 +205,14 @@ async def embed_query(text: str) -> list[float]:
     if not text or not text.strip():
         raise ValueError("embed_query requires a non-empty query string")
 
+    key = _query_cache_key(text)
+    async with _query_cache_lock:
+        cached = _query_cache.get(key)
+        if cached is not None:
+            _query_cache.move_to_end(key)
+            logger.debug("embed_query cache hit")
+            return cached
+
     client = _get_client()
 
     try:
@@ -110,7 +222,15 @@ async def embed_query(text: str) -> list[float]:
             input_type="query",
         )
         logger.debug("Embedded query (%d tokens)", result.total_tokens)
-        return result.embeddings[0]
     except Exception:
         logger.exception("VoyageAI embed_query failed")
         raise
+
+    embedding = result.embeddings[0]
+    async with _query_cache_lock:
+        _query_cache[key] = embedding
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > _QUERY_CACHE_MAX:
+            _query_cache.popitem(last=False)
+
+    return embedding
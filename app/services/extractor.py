@@ -5,6 +5,10 @@ Extracts name, email, and phone number using heuristics and regex patterns.
 
 import re
 
+# Contact info lives on the first page of virtually every CV, so the
+# email/phone scans only look at this many leading characters.
+_HEAD_CHARS = 2048
+
 # Section headers that should NOT be treated as candidate names
 _SECTION_HEADERS = {
     "summary", "objective", "experience", "education", "skills",
@@ -17,8 +21,52 @@ _SECTION_HEADERS = {
     "resume", "cv",
 }
 
-_EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-_PHONE_PATTERN = re.compile(r'[\+]?[\d\s\-\(\)\.]{7,20}')
+# Aho-Corasick automaton over the headers, used to recognise decorated
+# header lines ("Summary:", "Work Experience -") in one O(len(line))
+# scan. Optional, mirroring the chunker: without pyahocorasick only the
+# exact set membership below applies.
+try:
+    import ahocorasick
+
+    _HEADER_AUTOMATON = ahocorasick.Automaton()
+    for _header in _SECTION_HEADERS:
+        _HEADER_AUTOMATON.add_word(_header, _header)
+    _HEADER_AUTOMATON.make_automaton()
+except ImportError:
+    _HEADER_AUTOMATON = None
+
+
+def _is_section_header(lowered: str) -> bool:
+    """Return True if a lowercased line is a section header.
+
+    Exact set membership first. With the automaton available, a line is
+    also a header when a single known header covers it end-to-end after
+    trailing ':'/'-' decoration is stripped — deliberately not a plain
+    substring test, which would misclassify names and titles that merely
+    contain a header word ("Experienced Developer").
+    """
+    if lowered in _SECTION_HEADERS:
+        return True
+    if _HEADER_AUTOMATON is None:
+        return False
+
+    core = lowered.rstrip(" \t:-—")
+    n = len(core)
+    for end, header in _HEADER_AUTOMATON.iter(core):
+        if end == n - 1 and len(header) == n:
+            return True
+    return False
+
+
+# Both patterns are anchored at a concrete leading character: the engine
+# only attempts a match where one can actually start, instead of
+# retrying at every offset inside runs of symbols. The phone pattern
+# requires a digit after optional "("/"+" prefixes — "(555) 123-4567"
+# and "+1 555..." match from their opening character — which prunes the
+# matches the old permissive class produced from whitespace/punctuation
+# runs.
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,24}\b')
+_PHONE_PATTERN = re.compile(r'\(?\+?\d[\d\s\-().]{6,19}\b')
 
 
 def _extract_name(text: str) -> str:
@@ -36,7 +84,7 @@ def _extract_name(text: str) -> str:
         if len(stripped) < 2 or len(stripped) > 50:
             return "Unknown Candidate"
 
-        if stripped.lower() in _SECTION_HEADERS:
+        if _is_section_header(stripped.lower()):
             return "Unknown Candidate"
 
         return stripped
@@ -73,8 +121,28 @@ def extract_candidate_info(text: str) -> dict:
         Dictionary with keys "name" (str), "email" (str | None),
         and "phone" (str | None).
     """
+    # Regex work stays O(1) per resume regardless of page count; the
+    # name heuristic already only reads the first meaningful line.
+    head = text[:_HEAD_CHARS]
     return {
-        "name": _extract_name(text),
-        "email": _extract_email(text),
-        "phone": _extract_phone(text),
+        "name": _extract_name(head),
+        "email": _extract_email(head),
+        "phone": _extract_phone(head),
     }
+
+
+def extract_candidate_info_batch(texts: list[str]) -> list[dict]:
+    """Extract candidate info for a batch of resume texts.
+
+    Batch entry point for bulk ingestion. The patterns are compiled once
+    at module import and each scan is bounded to the document head, so
+    per-resume work is a few C-level regex calls; the loop itself is not
+    the bottleneck.
+
+    Args:
+        texts: Plain text contents of the resumes.
+
+    Returns:
+        One extract_candidate_info() result dict per input, in order.
+    """
+    return [extract_candidate_info(text) for text in texts]
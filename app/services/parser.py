@@ -1,20 +1,87 @@
 """Resume parser service - extracts text from PDF and DOCX files."""
 
+import asyncio
+import hashlib
 import io
 import logging
 import re
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 
 import pdfplumber
+import pypdfium2
 from docx import Document
+from lxml import etree
+
+# WordprocessingML namespace; paragraphs are w:p, text runs are w:t.
+_DOCX_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_DOCX_P_TAG = f"{{{_DOCX_NS}}}p"
+_DOCX_T_TAG = f"{{{_DOCX_NS}}}t"
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Whitespace cleanup patterns: trailing whitespace before a newline, and
+# runs of 3+ newlines. Both substitutions execute inside the C regex
+# engine, so cleanup makes no per-line Python allocations.
+_TRAILING_WS_RE = re.compile(r"[^\S\n]+\n")
+_NEWLINE_RUNS_RE = re.compile(r"\n{3,}")
+
+# LRU of parsed text keyed by sha256 of the file content. Re-uploads of
+# an identical CV skip the PDF/DOCX extraction entirely; hashing the
+# bytes is orders of magnitude cheaper than parsing them.
+_PARSE_CACHE_MAX = 256
+
+_parse_cache: OrderedDict[str, str] = OrderedDict()
+
+# Worker pool for the CPU-bound extraction itself, so bulk uploads parse
+# in parallel across cores instead of serializing on the event loop.
+# Created lazily; the cache above stays in the parent process.
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=settings.parse_workers or None
+        )
+    return _parse_pool
+
 
-def parse_pdf(content: bytes) -> str:
-    """Extract text from PDF bytes using pdfplumber.
+def shutdown_parse_pool() -> None:
+    """Tear down the parse worker pool. Called from the app lifespan."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+def _content_hash(source: bytes | str | Path) -> str:
+    """sha256 hex digest of the raw bytes or of the file at *source*."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        while chunk := f.read(1 << 16):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_pdf(source: bytes | str | Path) -> str:
+    """Extract text from a PDF using the configured backend.
+
+    The default pdfium backend extracts in native code and is roughly an
+    order of magnitude faster than pdfplumber's pure-Python layout
+    analysis; set pdf_backend="plumber" to compare or fall back.
 
     Args:
-        content: Raw PDF file bytes.
+        source: Raw PDF bytes, or a path to a PDF on disk. Passing a path
+            lets the backend seek within the file instead of requiring
+            the whole document in memory.
 
     Returns:
         Extracted text with pages separated by newlines.
@@ -22,13 +89,57 @@ def parse_pdf(content: bytes) -> str:
     Raises:
         ValueError: If the PDF is malformed, encrypted, or unreadable.
     """
+    if settings.pdf_backend == "pdfium":
+        return _parse_pdf_pdfium(source)
+    return _parse_pdf_plumber(source)
+
+
+def _parse_pdf_pdfium(source: bytes | str | Path) -> str:
+    """pypdfium2 backend: text extraction runs in the native pdfium core."""
+    try:
+        pdf = pypdfium2.PdfDocument(source)
+        try:
+            pages_text = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                text = textpage.get_text_range().strip()
+                textpage.close()
+                page.close()
+                if text:
+                    pages_text.append(text)
+        finally:
+            pdf.close()
+    except Exception as exc:
+        logger.error("Failed to parse PDF: %s", exc)
+        raise ValueError(f"Failed to parse PDF file: {exc}") from exc
+
+    return _clean_whitespace("\n\n".join(pages_text))
+
+
+def _parse_pdf_plumber(source: bytes | str | Path) -> str:
+    """pdfplumber backend: slower, kept for comparison and fallback.
+
+    With pdf_parallel_pages enabled, multi-page documents are extracted
+    across a small thread pool — pdfminer's decompression work releases
+    the GIL — and rejoined in page order. Off by default because some
+    pdfplumber versions share parser state across pages.
+    """
+    stream = io.BytesIO(source) if isinstance(source, bytes) else source
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            pages_text = [
-                text.strip()
-                for page in pdf.pages
-                if (text := page.extract_text())
-            ]
+        with pdfplumber.open(stream) as pdf:
+            pages = pdf.pages
+            if settings.pdf_parallel_pages and len(pages) > 1:
+                with ThreadPoolExecutor(max_workers=min(8, len(pages))) as pool:
+                    raw_texts = list(
+                        pool.map(lambda page: page.extract_text() or "", pages)
+                    )
+                pages_text = [text.strip() for text in raw_texts if text.strip()]
+            else:
+                pages_text = [
+                    text.strip()
+                    for page in pages
+                    if (text := page.extract_text())
+                ]
     except Exception as exc:
         logger.error("Failed to parse PDF: %s", exc)
         raise ValueError(f"Failed to parse PDF file: {exc}") from exc
@@ -36,11 +147,16 @@ def parse_pdf(content: bytes) -> str:
     return _clean_whitespace("\n\n".join(pages_text))
 
 
-def parse_docx(content: bytes) -> str:
-    """Extract text from DOCX bytes using python-docx.
+def parse_docx(source: bytes | str | Path) -> str:
+    """Extract text from a DOCX file.
+
+    Reads word/document.xml out of the DOCX zip and extracts paragraph
+    text in a single lxml.iterparse pass, sidestepping python-docx's
+    per-paragraph object model. python-docx remains as a fallback for
+    documents the direct path cannot handle.
 
     Args:
-        content: Raw DOCX file bytes.
+        source: Raw DOCX bytes, or a path to a DOCX on disk.
 
     Returns:
         Extracted text with paragraphs separated by newlines.
@@ -49,7 +165,42 @@ def parse_docx(content: bytes) -> str:
         ValueError: If the DOCX file is malformed or unreadable.
     """
     try:
-        doc = Document(io.BytesIO(content))
+        return _parse_docx_lxml(source)
+    except Exception as exc:
+        logger.warning("Direct DOCX parse failed (%s); retrying with python-docx", exc)
+    return _parse_docx_python_docx(source)
+
+
+def _parse_docx_lxml(source: bytes | str | Path) -> str:
+    """Streaming lxml pass over word/document.xml.
+
+    iterparse emits each w:p element as it completes; the paragraph's
+    w:t text runs are joined and the element cleared, so memory stays
+    flat regardless of document length and all the XML work happens in C.
+    """
+    with zipfile.ZipFile(
+        io.BytesIO(source) if isinstance(source, bytes) else source
+    ) as archive:
+        xml = archive.read("word/document.xml")
+
+    paragraphs_text = []
+    for _event, paragraph in etree.iterparse(
+        io.BytesIO(xml), events=("end",), tag=_DOCX_P_TAG
+    ):
+        text = "".join(
+            t.text for t in paragraph.iter(_DOCX_T_TAG) if t.text
+        ).strip()
+        if text:
+            paragraphs_text.append(text)
+        paragraph.clear()
+
+    return _clean_whitespace("\n\n".join(paragraphs_text))
+
+
+def _parse_docx_python_docx(source: bytes | str | Path) -> str:
+    """python-docx fallback, kept for documents the lxml path rejects."""
+    try:
+        doc = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
         paragraphs_text = [
             text for para in doc.paragraphs if (text := para.text.strip())
         ]
@@ -76,23 +227,76 @@ async def parse_resume(file_content: bytes, filename: str) -> str:
     Raises:
         ValueError: If the file type is unsupported or parsing fails.
     """
+    return await _parse_source(file_content, filename)
+
+
+async def parse_resume_path(file_path: str | Path, filename: str) -> str:
+    """Parse a resume already streamed to disk and return extracted text.
+
+    Path-based variant of parse_resume: the parsing libraries open and
+    seek within the file themselves, so the raw bytes never need to be
+    held in memory alongside the extracted text.
+
+    Args:
+        file_path: Location of the file on disk.
+        filename: Original filename (used to determine file type).
+
+    Returns:
+        Extracted text from the resume.
+
+    Raises:
+        ValueError: If the file type is unsupported or parsing fails.
+    """
+    return await _parse_source(file_path, filename)
+
+
+async def _parse_source(source: bytes | str | Path, filename: str) -> str:
+    """Dispatch to the parser matching the filename extension.
+
+    Results are cached by content hash, so parsing only runs for bytes
+    this process has not seen before. The extraction itself runs in the
+    process pool; hashing and the cache stay in the event-loop process.
+    """
     extension = filename.rsplit(".", maxsplit=1)[-1].lower() if "." in filename else ""
 
-    if extension == "pdf":
-        return parse_pdf(file_content)
-    if extension == "docx":
-        return parse_docx(file_content)
+    if extension not in ("pdf", "docx"):
+        raise ValueError(
+            f"Unsupported file type: '.{extension}'. Only PDF and DOCX files are accepted."
+        )
 
-    raise ValueError(
-        f"Unsupported file type: '.{extension}'. Only PDF and DOCX files are accepted."
+    key = _content_hash(source)
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        _parse_cache.move_to_end(key)
+        logger.info("parser.cache_hit hash=%s file=%s", key[:12], filename)
+        return cached
+    logger.debug("parser.cache_miss hash=%s file=%s", key[:12], filename)
+
+    loop = asyncio.get_running_loop()
+    text = await loop.run_in_executor(
+        _get_parse_pool(), _dispatch_parse, source, extension
     )
 
+    _parse_cache[key] = text
+    while len(_parse_cache) > _PARSE_CACHE_MAX:
+        _parse_cache.popitem(last=False)
+
+    return text
+
+
+def _dispatch_parse(source: bytes | str | Path, extension: str) -> str:
+    """Run in a pool worker: extract text with the matching parser."""
+    return parse_pdf(source) if extension == "pdf" else parse_docx(source)
+
 
 def _clean_whitespace(text: str) -> str:
     """Strip excessive whitespace while preserving section structure.
 
     Collapses runs of 3+ newlines down to 2 (keeping paragraph breaks)
-    and trims trailing whitespace from each line.
+    and trims trailing whitespace from each line. Runs as three whole-
+    string passes in C — normalize line endings, drop trailing
+    whitespace, collapse newline runs — instead of splitting the
+    document into per-line str objects.
 
     Args:
         text: Raw extracted text.
@@ -100,6 +304,7 @@ def _clean_whitespace(text: str) -> str:
     Returns:
         Cleaned text.
     """
-    text = "\n".join(line.rstrip() for line in text.splitlines())
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _TRAILING_WS_RE.sub("\n", text)
+    text = _NEWLINE_RUNS_RE.sub("\n\n", text)
     return text.strip()
